@@ -1,6 +1,5 @@
 import sys
 import numpy as np
-import tcod
 import google.generativeai as genai
 import sounddevice as sd
 import soundfile as sf
@@ -9,6 +8,19 @@ import os
 import random
 import json
 import logging
+import queue
+import shutil
+import tempfile
+import threading
+import time
+from operator import attrgetter
+from pathlib import Path
+from sqlalchemy import Index, delete, event, func, literal_column, select, table, text
+
+try:
+    import orjson
+except ImportError:  # Optional speedup; the stdlib json module is used otherwise.
+    orjson = None
 import ui_styles
 
 logging.basicConfig(filename='dm_assistant.log', level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -24,19 +36,538 @@ from ui_dialogs import (ResponseDialog, AddMonsterDialog, MonsterDetailDialog,
 
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QHBoxLayout, QPushButton, QLabel, QLineEdit,
-                             QTextEdit, QTableWidget, QTableWidgetItem,
+                             QTextEdit, QTableView,
                              QTabWidget, QSplitter, QGraphicsView,
                              QGraphicsScene, QGraphicsRectItem, QToolBar,
                              QStatusBar, QMessageBox, QDialog, QFileDialog,
                              QComboBox, QTextBrowser, QListWidget, QListWidgetItem,
                              QProgressBar, QSlider, QGroupBox, QFrame, QInputDialog,
-                             QGraphicsSimpleTextItem, QAbstractItemView, QCheckBox)
-from PyQt6.QtGui import QAction, QColor, QBrush, QPen, QIntValidator, QImage, QPainter, QFont, QPixmap
-from PyQt6.QtCore import Qt, QThread, pyqtSignal, QTimer, QUrl, QRectF
+                             QGraphicsSimpleTextItem, QAbstractItemView, QCheckBox, QSpinBox,
+                             QSizePolicy, QPlainTextEdit, QPlainTextDocumentLayout)
+from PyQt6.QtGui import (QAction, QColor, QBrush, QPen, QImage, QPainter, QFont, QPixmap,
+                         QPixmapCache, QTextCursor, QTextDocument, QImageWriter)
+from PyQt6.QtCore import (Qt, QThread, pyqtSignal, QTimer, QUrl, QRectF,
+                          QAbstractTableModel, QModelIndex, QObject, QRunnable, QThreadPool, QEvent)
+
+
+class EntityTableModel(QAbstractTableModel):
+    """Read-only table model that renders ORM rows on demand.
+
+    Args:
+        columns (list): (header, getter) tuples, one per column.
+        rows (list, optional): Row objects, kept by reference.
+    """
+
+    def __init__(self, columns, rows=None, parent=None):
+        super().__init__(parent)
+        self._columns = columns
+        self._rows = rows if rows is not None else []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._columns)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self._columns[section][0]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        value = self._columns[index.column()][1](self._rows[index.row()])
+        return "" if value is None else str(value)
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        getter = self._columns[column][1]
+
+        def sort_key(row):
+            value = getter(row)
+            return (0, value, "") if isinstance(value, (int, float)) else (1, 0, "" if value is None else str(value))
+
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        persistent_rows = [self._rows[index.row()] for index in persistent]
+        self._rows = sorted(self._rows, key=sort_key, reverse=order == Qt.SortOrder.DescendingOrder)
+        positions = {id(row): position for position, row in enumerate(self._rows)}
+        self.changePersistentIndexList(persistent, [self.index(positions[id(row)], index.column())
+                                                    for row, index in zip(persistent_rows, persistent)])
+        self.layoutChanged.emit()
+
+    def set_rows(self, rows):
+        """Swap in a new result list without touching any widgets."""
+        self.beginResetModel()
+        self._rows = rows
+        self.endResetModel()
+
+    def row_at(self, row):
+        return self._rows[row]
+
+    def append_row(self, row):
+        position = len(self._rows)
+        self.beginInsertRows(QModelIndex(), position, position)
+        self._rows.append(row)
+        self.endInsertRows()
+
+    def replace_row(self, position, row):
+        """Swap one row object and repaint just that row."""
+        self._rows[position] = row
+        self.dataChanged.emit(self.index(position, 0), self.index(position, len(self._columns) - 1),
+                              [Qt.ItemDataRole.DisplayRole])
+
+    def remove_row(self, position):
+        self.beginRemoveRows(QModelIndex(), position, position)
+        del self._rows[position]
+        self.endRemoveRows()
+
+
+class QueryRunnable(QRunnable):
+    """Runs a read-only query on a pooled thread with its own session.
+
+    Args:
+        query (callable): Takes a session and returns the result list.
+        generation (int): Echoed back with the results so stale searches can be dropped.
+    """
+
+    class Signals(QObject):
+        done = pyqtSignal(int, list)
+        failed = pyqtSignal(int, str)
+
+    def __init__(self, query, generation):
+        super().__init__()
+        self.query = query
+        self.generation = generation
+        self.signals = self.Signals()
+
+    def run(self):
+        db_session = SessionLocal()
+        try:
+            self.signals.done.emit(self.generation, self.query(db_session))
+        except Exception as e:
+            self.signals.failed.emit(self.generation, str(e))
+        finally:
+            db_session.close()
+
+
+class NPCDeleteRunnable(QRunnable):
+    """Deletes a batch of NPCs on a pooled thread in one transaction.
+
+    Args:
+        npc_ids (list): Primary keys of the NPCs to delete.
+    """
+
+    class Signals(QObject):
+        done = pyqtSignal(list, int)
+        failed = pyqtSignal(list, str)
+
+    def __init__(self, npc_ids):
+        super().__init__()
+        self.npc_ids = npc_ids
+        self.signals = self.Signals()
+
+    def run(self):
+        try:
+            # Commits on success, rolls back on error and closes the session either way
+            with SessionLocal.begin() as db_session:
+                # One DELETE statement; no SELECT and no NPC instances to build just to mark deleted
+                result = db_session.execute(delete(NPC).where(NPC.id.in_(self.npc_ids)))
+        except Exception as e:
+            self.signals.failed.emit(self.npc_ids, str(e))
+        else:
+            self.signals.done.emit(self.npc_ids, result.rowcount)
+
+
+class ImageSaveRunnable(QRunnable):
+    """Encodes and writes an image file on a pooled thread.
+
+    Args:
+        image (QImage): The image to write. QImage, unlike QPixmap, is safe to use off the GUI thread.
+        file_path (str): Destination; the format is taken from the file extension.
+    """
+
+    class Signals(QObject):
+        done = pyqtSignal(str)
+        failed = pyqtSignal(str, str)
+
+    def __init__(self, image, file_path):
+        super().__init__()
+        self.image = image
+        self.file_path = file_path
+        self.signals = self.Signals()
+
+    def run(self):
+        writer = QImageWriter(self.file_path)
+        if writer.write(self.image):
+            self.signals.done.emit(self.file_path)
+        else:
+            self.signals.failed.emit(self.file_path, writer.errorString())
+
+
+class DeviceProbeRunnable(QRunnable):
+    """Checks on a pooled thread that an audio input device supports the recording settings.
+
+    Args:
+        device_id (int): The sounddevice device index.
+        sample_rate (int): The sample rate recordings are made at.
+    """
+
+    class Signals(QObject):
+        done = pyqtSignal(int)
+        failed = pyqtSignal(int, str)
+
+    def __init__(self, device_id, sample_rate):
+        super().__init__()
+        self.device_id = device_id
+        self.sample_rate = sample_rate
+        self.signals = self.Signals()
+
+    def run(self):
+        try:
+            sd.check_input_settings(device=self.device_id, samplerate=self.sample_rate, channels=1)
+        except Exception as e:
+            self.signals.failed.emit(self.device_id, str(e))
+        else:
+            self.signals.done.emit(self.device_id)
+
+
+class AudioLoadRunnable(QRunnable):
+    """Opens a session WAV file for streamed playback on a pooled thread.
+
+    Only the header is read here; frames are read from the emitted SoundFile as playback needs them.
+
+    Args:
+        file_path (str): The WAV file to open.
+    """
+
+    class Signals(QObject):
+        loaded = pyqtSignal(str, object)
+        failed = pyqtSignal(str, str)
+
+    def __init__(self, file_path):
+        super().__init__()
+        self.file_path = file_path
+        self.signals = self.Signals()
+
+    def run(self):
+        try:
+            sound_file = sf.SoundFile(self.file_path)
+        except Exception as e:
+            self.signals.failed.emit(self.file_path, str(e))
+        else:
+            self.signals.loaded.emit(self.file_path, sound_file)
+
+
+class CombatTableModel(QAbstractTableModel):
+    """Editable table model over a list of dicts, used by the combat tracker.
+
+    Row backgrounds are computed when a row changes and cached, so painting is a list lookup.
+
+    Args:
+        columns (list): (header, key) tuples, one per column.
+        rows (list, optional): Row dicts, kept by reference.
+        row_brush (callable, optional): Takes a row dict and returns a QBrush or None.
+    """
+
+    HIGHLIGHT_BRUSH = QBrush(QColor(Qt.GlobalColor.lightGray))
+    DOWN_BRUSH = QBrush(QColor(255, 200, 200))
+
+    def __init__(self, columns, rows=None, row_brush=None, parent=None):
+        super().__init__(parent)
+        self._columns = columns
+        self._rows = rows if rows is not None else []
+        self._row_brush = row_brush
+        self._highlight_row = -1
+        self._backgrounds = []
+        self._rebuild_backgrounds()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._columns)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self._columns[section][0]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            value = self._rows[index.row()].get(self._columns[index.column()][1])
+            return "" if value is None else str(value)
+        if role == Qt.ItemDataRole.BackgroundRole:
+            return self._backgrounds[index.row()]
+        return None
+
+    def flags(self, index):
+        return super().flags(index) | Qt.ItemFlag.ItemIsEditable
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid() or role != Qt.ItemDataRole.EditRole:
+            return False
+        key = self._columns[index.column()][1]
+        if isinstance(self._rows[index.row()].get(key), int):
+            try:
+                value = int(value)
+            except ValueError:
+                return False
+        self._rows[index.row()][key] = value
+        self.dataChanged.emit(index, index, [role])
+        self._update_background(index.row())
+        return True
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        key = self._columns[column][1]
+
+        def sort_key(row):
+            value = row.get(key)
+            return (0, value, "") if isinstance(value, (int, float)) else (1, 0, str(value))
+
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        persistent_rows = [self._rows[index.row()] for index in persistent]
+        self._rows.sort(key=sort_key, reverse=order == Qt.SortOrder.DescendingOrder)
+        positions = {id(row): position for position, row in enumerate(self._rows)}
+        self.changePersistentIndexList(persistent, [self.index(positions[id(row)], index.column())
+                                                    for row, index in zip(persistent_rows, persistent)])
+        self._rebuild_backgrounds()
+        self.layoutChanged.emit()
+
+    def rows(self):
+        return self._rows
+
+    def row_at(self, row):
+        return self._rows[row]
+
+    def set_rows(self, rows):
+        """Swap in a new row list with a single model reset."""
+        self.beginResetModel()
+        self._rows = rows
+        self._highlight_row = -1
+        self._rebuild_backgrounds()
+        self.endResetModel()
+
+    def append_row(self, row):
+        position = len(self._rows)
+        self.beginInsertRows(QModelIndex(), position, position)
+        self._rows.append(row)
+        self._backgrounds.append(self._background(position))
+        self.endInsertRows()
+
+    def remove_row(self, row):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._rows[row]
+        self._rebuild_backgrounds()  # Rows shifted under the highlight index
+        self.endRemoveRows()
+
+    def set_value(self, row, key, value):
+        """Update one field of a row and repaint just that cell."""
+        self._rows[row][key] = value
+        index = self.index(row, self._column_of(key))
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.DisplayRole])
+        self._update_background(row)
+
+    def column_changed(self, key):
+        """Repaint one column after its values were updated in place."""
+        if not self._rows:
+            return
+        last_row = len(self._rows) - 1
+        column = self._column_of(key)
+        self.dataChanged.emit(self.index(0, column), self.index(last_row, column), [Qt.ItemDataRole.DisplayRole])
+        if self._row_brush is not None:
+            self._rebuild_backgrounds()
+            self.dataChanged.emit(self.index(0, 0), self.index(last_row, len(self._columns) - 1),
+                                  [Qt.ItemDataRole.BackgroundRole])
+
+    def _column_of(self, key):
+        return next(i for i, (_, k) in enumerate(self._columns) if k == key)
+
+    def set_highlight_row(self, row):
+        """Move the highlight, repainting only the affected rows."""
+        previous, self._highlight_row = self._highlight_row, row
+        for changed in {previous, row}:
+            self._update_background(changed)
+
+    def _background(self, row):
+        if row == self._highlight_row:
+            return self.HIGHLIGHT_BRUSH
+        return self._row_brush(self._rows[row]) if self._row_brush is not None else None
+
+    def _rebuild_backgrounds(self):
+        self._backgrounds = [self._background(row) for row in range(len(self._rows))]
+
+    def _update_background(self, row):
+        """Recompute one row's cached background, repainting the row if it changed."""
+        if not 0 <= row < len(self._rows):
+            return
+        background = self._background(row)
+        if background is not self._backgrounds[row]:
+            self._backgrounds[row] = background
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(self._columns) - 1),
+                                  [Qt.ItemDataRole.BackgroundRole])
+
 
 class DungeonMasterAssistant(QMainWindow):
     LAST_STATE_FILE = "last_combat_state_path.txt"
     CONFIG_FILE = "config.json"
+    D20_BATCH_SIZE = 4096
+    # Frames per audio callback for recording and playback, both opened with latency='low'.
+    # Smaller blocks cut latency and smooth the level meter; raise it if weak machines underrun.
+    AUDIO_BLOCK_SIZE = 512
+    # Playback position refresh; the label and slider are only touched when the second changes
+    PLAYBACK_UI_INTERVAL_MS = 33
+    # Playback slider units per second of audio, so seeks land to the centisecond
+    PLAYBACK_SLIDER_STEPS = 100
+    # How long an error reported through _show_error stays in the status bar
+    ERROR_MESSAGE_MS = 10000
+    # Sent once as the model's system instruction rather than prefixed onto every prompt
+    DM_SYSTEM_PROMPT = "Act as a helpful assistant for a Dungeon Master."
+    # AI Assistant prompt templates, filled with str.format; the DM framing is in DM_SYSTEM_PROMPT
+    AI_PROMPTS = {
+        "query": "Respond to the following request:\n\n---\n\n{request}",
+        "encounter": ("Generate a random D&D 5e encounter idea. Include a brief description of the scene, "
+                      "potential creatures, a challenge rating (CR) suggestion, and a minor plot hook or "
+                      "complication. Context: {context}"),
+        "npc": ("Create a brief description for a D&D NPC. Include their appearance, personality quirk, "
+                "a secret or goal, and a potential hook for players. Keywords: {keywords}"),
+        "plot_hook": ("Generate a D&D plot hook idea. Describe the initial situation, the inciting incident, "
+                      "and what the players might need to do. Theme/Keywords: {keywords}"),
+        "dungeon_room": ("Describe a D&D dungeon room. Include its appearance, notable features, potential traps "
+                         "or puzzles, and any monsters or treasures. Context: {context}"),
+        "summary": ("Read the following D&D session notes/transcript and provide a concise summary of the key "
+                    "events, important player decisions, and major outcomes.\n\n---\n\n{source}"),
+        "extraction": ("Read the following D&D session notes/transcript and extract the following information. "
+                       "If a category has no information, write 'None'.\n\n"
+                       "- **Key NPCs Mentioned:**\n"
+                       "- **Locations Visited or Described:**\n"
+                       "- **Quests Started or Advanced:**\n"
+                       "- **Unique Items or Loot Found:**\n\n"
+                       "---\n\n{source}"),
+    }
+    # Substrings of a Gemini error that mean the configured key was rejected
+    API_KEY_ERROR_MARKERS = ("API_KEY_INVALID", "API key not valid", "PERMISSION_DENIED")
+
+    # Readers no longer wait on importer commits under WAL; NORMAL skips the per-commit fsync.
+    SQLITE_PRAGMAS = ("PRAGMA journal_mode=WAL", "PRAGMA synchronous=NORMAL",
+                      "PRAGMA temp_store=MEMORY", "PRAGMA mmap_size=268435456")
+
+    # Indexes created at startup: the Advanced Filter columns, so filters are index seeks, and the
+    # spell list's (level_int, name) sort order, which level_int filters can also use.
+    ENTITY_INDEXES = (
+        (Monster.cr,), (MagicItem.type,), (MagicItem.rarity,), (Armor.category,), (Weapon.category,),
+        (Spell.school,), (Spell.level_int, Spell.name),
+    )
+
+    # Delay between the last keystroke in a search box and the query it triggers
+    SEARCH_DEBOUNCE_MS = 250
+    # Removed NPCs stay undoable this long; deletes made within the window are committed together
+    NPC_DELETE_UNDO_MS = 5000
+    # While the map view is being resized it is rescaled with FastTransformation; the smooth
+    # rescale waits until resizing has paused this long
+    MAP_SMOOTH_RESCALE_MS = 120
+
+    # Entities whose name column gets a substring-search index: an FTS5 trigram table on SQLite,
+    # a pg_trgm GIN index on PostgreSQL. Leading-wildcard ILIKE cannot use a B-tree.
+    NAME_SEARCH_ENTITIES = (Monster, Spell, MagicItem)
+    # The trigram tokenizer cannot match terms shorter than one trigram.
+    FTS_MIN_TERM_LENGTH = 3
+
+    # Main tabs built on first show: title -> method that fills the empty tab widget it is given.
+    # Added after the eagerly built tabs, in this order.
+    LAZY_TABS = {
+        "Session Manager": "create_session_manager_tab",
+        "AI Assistant": "create_ai_assistant_tab",
+    }
+
+    # Map marker paint, shared by every marker drawn
+    ENTITY_MARKER_BRUSHES = {
+        "Monsters": QBrush(QColor("#FF0000")),
+        "Magic Items": QBrush(QColor("#00FF00")),
+        "Armor": QBrush(QColor("#0000FF")),
+        "Weapons": QBrush(QColor("#FFFF00")),
+    }
+    MARKER_OUTLINE_PEN = QPen(Qt.PenStyle.NoPen)
+    MARKER_TEXT_PEN = QPen(QColor("#FFFFFF"))
+
+    # Layout of each entity sub-tab, in tab order. Slots are method names resolved on the instance.
+    ENTITY_TAB_CONFIG = {
+        "Monsters": {
+            "attr": "monster",
+            "group": "Monster Database",
+            "columns": [("Name", attrgetter("name")), ("CR", attrgetter("cr")),
+                        ("HP", attrgetter("hp")), ("AC", attrgetter("ac"))],
+            "details_slot": "_show_monster_details",
+            "search_placeholder": "Search local monsters by name...",
+            "search_slot": "_on_local_search_clicked",
+            "filter_slot": "_open_filter_dialog",
+            "import_label": "Import All SRD Monsters",
+            "import_slot": "_on_import_all_monsters_clicked",
+        },
+        "Magic Items": {
+            "attr": "item",
+            "group": "Magic Item Database",
+            "columns": [("Name", attrgetter("name")), ("Type", attrgetter("type")),
+                        ("Rarity", attrgetter("rarity"))],
+            "details_slot": "_show_magic_item_details",
+            "filter_slot": "_open_item_filter_dialog",
+            "import_label": "Import All SRD Magic Items",
+            "import_slot": "_on_import_all_magic_items_clicked",
+        },
+        "Armor": {
+            "attr": "armor",
+            "group": "Armor Database",
+            "columns": [("Name", attrgetter("name")), ("Category", attrgetter("category")),
+                        ("AC", attrgetter("ac_string"))],
+            "details_slot": "_show_armor_details",
+            "filter_slot": "_open_armor_filter_dialog",
+            "import_label": "Import All SRD Armor",
+            "import_slot": "_on_import_all_armor_clicked",
+        },
+        "Weapons": {
+            "attr": "weapon",
+            "group": "Weapon Database",
+            "columns": [("Name", attrgetter("name")), ("Category", attrgetter("category")),
+                        ("Damage", attrgetter("damage"))],
+            "details_slot": "_show_weapon_details",
+            "filter_slot": "_open_weapon_filter_dialog",
+            "import_label": "Import All SRD Weapons",
+            "import_slot": "_on_import_all_weapons_clicked",
+        },
+        "Spells": {
+            "attr": "spell",
+            "group": "Spell Database",
+            "columns": [("Name", attrgetter("name")), ("Level", attrgetter("level_str")),
+                        ("School", attrgetter("school"))],
+            "details_slot": "_show_spell_details",
+            "search_placeholder": "Search local spells by name...",
+            "search_slot": "_on_local_spell_search_clicked",
+            "filter_slot": "_open_spell_filter_dialog",
+            "import_label": "Import All SRD Spells",
+            "import_slot": "_on_import_all_spells_clicked",
+        },
+    }
+
+    # Summary columns of the NPC table
+    NPC_COLUMNS = [("Name", attrgetter("name")), ("Type", attrgetter("npc_type")),
+                   ("Location", attrgetter("location")), ("Status", attrgetter("status")),
+                   ("Race", attrgetter("race")), ("Class", attrgetter("npc_class"))]
+
+    # Columns fetched for the entity list tables; detail dialogs still load the full row.
+    LIST_COLUMNS = {
+        Monster: (Monster.id, Monster.name, Monster.cr, Monster.hp, Monster.ac),
+        MagicItem: (MagicItem.id, MagicItem.name, MagicItem.type, MagicItem.rarity),
+        Armor: (Armor.id, Armor.name, Armor.category, Armor.ac_string),
+        Weapon: (Weapon.id, Weapon.name, Weapon.category,
+                 # SQL || yields NULL if either side is NULL, so blank missing parts instead
+                 func.trim(func.coalesce(Weapon.damage_dice, "") + " "
+                           + func.coalesce(Weapon.damage_type, "")).label("damage")),
+        Spell: (Spell.id, Spell.name, Spell.level_str, Spell.school),
+        NPC: (NPC.id, NPC.name, NPC.npc_type, NPC.location, NPC.status, NPC.race, NPC.npc_class),
+    }
 
     def __init__(self):
         super().__init__()
@@ -45,8 +576,15 @@ class DungeonMasterAssistant(QMainWindow):
 
         setup_database()
         seed_data_if_needed()
-
-        self.rng = tcod.random.Random()
+        self.db = SessionLocal()  # Long-lived read session; writes use their own short-lived sessions
+        self._configure_sqlite()
+        self._ensure_entity_indexes()
+        self.fts_name_entities = set()
+        self._ensure_name_search_indexes()
+
+        self.rng = np.random.default_rng()
+        self.d20_rolls = self.rng.integers(1, 21, size=self.D20_BATCH_SIZE)
+        self.d20_roll_index = 0
         self.gemini_worker = None
         self.transcriber_worker = None
         self.monster_importer_worker = None
@@ -56,9 +594,17 @@ class DungeonMasterAssistant(QMainWindow):
         self.spell_importer_worker = None
 
         self.recording_state = "stopped"
-        self.recorded_frames = []
+        self.recorded_length = 0  # Frames captured so far
+        # While recording, captured blocks go through recording_chunks to a writer thread that
+        # streams them into a temporary WAV file, moved to the user's chosen path on stop
+        self.recording_chunks = None
+        self.recording_writer = None
+        self.recording_file = None
+        self.recording_temp_path = None
         self.audio_stream = None
         self.sample_rate = 44100
+        self.audio_devices = []  # sd.query_devices() as of the last device refresh
+        self.checked_input_devices = set()  # Device ids that passed check_input_settings since then
         self.elapsed_seconds = 0
         self.recording_timer = QTimer(self)
         self.recording_timer.timeout.connect(self._update_timer_display)
@@ -67,9 +613,17 @@ class DungeonMasterAssistant(QMainWindow):
         self.last_peak_level = 0.0
 
         self.playback_stream = None
-        self.loaded_audio_data = None
+        self.playback_file = None  # Open sf.SoundFile for the loaded session, read block by block during playback
+        self.playback_frames = 0  # Length and channel count of playback_file, cached for the callback
+        self.playback_channels = 1
         self.current_playback_filepath = None
-        self.current_frame = 0
+        self.pending_audio_path = None  # File an AudioLoadRunnable is decoding for load_session
+        self.current_frame = 0  # Written by the playback callback; an int store, so no lock is needed
+        self.playback_total_text = "00:00"  # Length of the loaded session, formatted once on load
+        self.playback_shown_second = None
+        self.playback_timer = QTimer(self)
+        self.playback_timer.setInterval(self.PLAYBACK_UI_INTERVAL_MS)
+        self.playback_timer.timeout.connect(self._update_playback_display)
         self.session_timestamps = []
 
         self.current_map_rooms = []
@@ -82,25 +636,33 @@ class DungeonMasterAssistant(QMainWindow):
             "Weapons": {}
         }
 
-        self.gemini_model = None
+        self.gemini_model = None  # AI Assistant model, with DM_SYSTEM_PROMPT as its system instruction
+        self.transcription_model = None  # Same model without the DM framing, for session transcripts
+        self.filter_dialogs = {}  # Filter dialog class -> instance, reused across clicks
+        self.placement_entity_cache = {}  # (entity type, query bucket) -> placement candidate rows
+        self.placement_cache_generation = 0  # Bumped on every drop so in-flight prefetches are discarded
+        self.search_generations = {}  # Entity -> id of its latest search; older results are dropped
 
         self.central_widget = QTabWidget(self)
         self.setCentralWidget(self.central_widget)
 
         # Initialize combat state
-        self.ailments = {}  # Dictionary for ailment tracking
+        self.ailments = {}  # Combatant name -> {ailment name: {"name", "duration", "source"}}
         self.tab_initialized = {}  # Dictionary for tab initialization
         self.current_turn_row = -1
         self.current_round = 1
         self.first_combatant_name_for_round_check = ""
+        self.combat_state_dirty = False  # Set by combat mutations, cleared once saved
 
         # Create tabs
         self.create_dashboard_tab()
         self.create_entity_management_tab()
         self.create_combat_tracker_tab()
         self.create_map_generator_tab()
-        self.create_session_manager_tab()
-        self.create_ai_assistant_tab()
+        self.combat_state_dirty = False  # The startup map's log lines are not a combat worth auto-saving
+        for title in self.LAZY_TABS:
+            self.central_widget.addTab(QWidget(), title)
+        self.central_widget.currentChanged.connect(self._on_main_tab_changed)
 
         self._create_toolbar()
         self._create_statusbar()
@@ -111,19 +673,118 @@ class DungeonMasterAssistant(QMainWindow):
         self.auto_save_timer.start(self.auto_save_interval)
         self.current_combat_file_path = None
 
-        last_path = self._load_last_state_path()
-        if last_path:
-            self.statusBar().showMessage(
-                f"Attempting to auto-load last combat state from: {os.path.basename(last_path)}")
-            QTimer.singleShot(100, lambda: self._load_combat_state(file_path=last_path))
-            self.current_combat_file_path = last_path
-        else:
-            self.statusBar().showMessage("Ready (No previous combat state to auto-load)")
-            self.current_combat_file_path = "auto_save_combat_state.json"
-            self._save_last_state_path(self.current_combat_file_path)
+        # Restore the last combat state once the event loop is running so the
+        # window can paint before any file I/O happens.
+        self.current_combat_file_path = "auto_save_combat_state.json"
+        QTimer.singleShot(0, self._restore_last_combat_state)
+        # Load the message box style and icons now, not inside the first confirmation the user opens
+        QTimer.singleShot(0, self._warm_message_box)
 
         QTimer.singleShot(50, self._get_gemini_api_key)
 
+    def _warm_message_box(self):
+        """Shows and hides an off-screen QMessageBox so its first real use opens without a stall."""
+        message_box = QMessageBox(QMessageBox.Icon.Question, "", "", parent=self)
+        message_box.setAttribute(Qt.WidgetAttribute.WA_DontShowOnScreen)
+        message_box.show()
+        message_box.hide()
+        message_box.deleteLater()
+
+    def _configure_sqlite(self):
+        """Applies SQLITE_PRAGMAS to every connection the shared engine opens."""
+        engine = self.db.get_bind()
+        if engine.dialect.name != "sqlite":
+            return
+        event.listen(engine, "connect", self._apply_sqlite_pragmas)
+        engine.dispose()  # Drop connections pooled during setup so they reconnect with the pragmas
+
+    @classmethod
+    def _apply_sqlite_pragmas(cls, dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in cls.SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+        cursor.close()
+
+    def _ensure_entity_indexes(self):
+        """Creates any missing ENTITY_INDEXES."""
+        bind = self.db.get_bind()
+        for columns in self.ENTITY_INDEXES:
+            name = "_".join([columns[0].table.name] + [column.key for column in columns])
+            index = Index(f"ix_{name}", *columns)
+            try:
+                index.create(bind, checkfirst=True)
+            except Exception as e:
+                logging.warning(f"Could not create index {index.name}: {e}")
+
+    def _ensure_name_search_indexes(self):
+        """Creates the NAME_SEARCH_ENTITIES substring indexes for the current dialect."""
+        bind = self.db.get_bind()
+        for entity in self.NAME_SEARCH_ENTITIES:
+            table_name = entity.__table__.name
+            try:
+                if bind.dialect.name == "sqlite":
+                    self._ensure_fts_name_table(bind, table_name)
+                    self.fts_name_entities.add(entity)
+                elif bind.dialect.name == "postgresql":
+                    with bind.begin() as conn:
+                        conn.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+                    Index(f"ix_{table_name}_name_trgm", entity.name, postgresql_using="gin",
+                          postgresql_ops={"name": "gin_trgm_ops"}).create(bind, checkfirst=True)
+            except Exception as e:
+                logging.warning(f"Could not create name search index for {table_name}: {e}")
+
+    @staticmethod
+    def _ensure_fts_name_table(bind, table_name):
+        """Creates an external-content FTS5 table over table_name.name, kept in sync by triggers."""
+        fts = f"{table_name}_name_fts"
+        with bind.begin() as conn:
+            exists = conn.exec_driver_sql(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (fts,)).first()
+            conn.exec_driver_sql(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+                f"name, content='{table_name}', content_rowid='id', tokenize='trigram')")
+            conn.exec_driver_sql(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table_name} BEGIN "
+                f"INSERT INTO {fts}(rowid, name) VALUES (new.id, new.name); END")
+            conn.exec_driver_sql(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table_name} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, name) VALUES ('delete', old.id, old.name); END")
+            conn.exec_driver_sql(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF name ON {table_name} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, name) VALUES ('delete', old.id, old.name); "
+                f"INSERT INTO {fts}(rowid, name) VALUES (new.id, new.name); END")
+            if not exists:
+                conn.exec_driver_sql(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+    def _name_search_clause(self, entity, search_term):
+        """Returns a case-insensitive substring filter on entity.name, index-backed where possible."""
+        if entity in self.fts_name_entities and len(search_term) >= self.FTS_MIN_TERM_LENGTH:
+            fts = f"{entity.__table__.name}_name_fts"
+            phrase = '"' + search_term.replace('"', '""') + '"'
+            matches = select(literal_column("rowid")).select_from(table(fts)).where(
+                text(f"{fts} MATCH :phrase").bindparams(phrase=phrase))
+            return entity.id.in_(matches)
+        return entity.name.ilike(f"%{search_term}%")
+
+    def closeEvent(self, event):
+        self._flush_npc_deletes()
+        QThreadPool.globalInstance().waitForDone()  # Let queued deletes and image saves finish
+        if self.playback_stream:  # Only set once the Session Manager tab, and its playback widgets, exist
+            self.stop_playback()
+        if self.playback_file is not None:
+            self.playback_file.close()
+        self.db.close()
+        super().closeEvent(event)
+
+    def _roll_d20(self):
+        """Returns the next d20 roll from a batch drawn in a single numpy call."""
+        if self.d20_roll_index >= len(self.d20_rolls):
+            self.d20_rolls = self.rng.integers(1, 21, size=self.D20_BATCH_SIZE)
+            self.d20_roll_index = 0
+        roll = int(self.d20_rolls[self.d20_roll_index])
+        self.d20_roll_index += 1
+        return roll
+
     def _create_toolbar(self):
         toolbar = QToolBar("Main Toolbar")
         self.addToolBar(toolbar)
@@ -138,7 +799,60 @@ class DungeonMasterAssistant(QMainWindow):
 
     def _create_statusbar(self):
         self.setStatusBar(QStatusBar(self))
-        self.statusBar().showMessage("Ready")
+        # QStatusBar.showMessage repaints synchronously; a label's setText just schedules an update
+        self.status_label = QLabel("Ready", self)
+        self.statusBar().addPermanentWidget(self.status_label, 1)
+        self.status_clear_timer = QTimer(self)
+        self.status_clear_timer.setSingleShot(True)
+        self.status_clear_timer.timeout.connect(self.status_label.clear)
+        self.selection_warning_box = None  # Built by _warn_selection on first use, then reused
+        self.undo_delete_button = QPushButton("Undo", self)
+        self.undo_delete_button.clicked.connect(self._undo_npc_delete)
+        self.undo_delete_button.hide()
+        self.statusBar().addPermanentWidget(self.undo_delete_button)
+
+        # Importer progress arrives once per record; repaint the status bar at most 10 times a second
+        self.pending_status = None
+        self.status_timer = QTimer(self)
+        self.status_timer.setInterval(100)
+        self.status_timer.timeout.connect(self._flush_status)
+
+    def _show_status(self, message, timeout_ms=0):
+        """Shows a status message now, clearing it after timeout_ms if that is non-zero."""
+        self.status_label.setText(message)
+        if timeout_ms:
+            self.status_clear_timer.start(timeout_ms)
+        else:
+            self.status_clear_timer.stop()
+
+    def _warn_selection(self, message):
+        """Shows a "Selection Error" warning, reusing one QMessageBox built on first use."""
+        if self.selection_warning_box is None:
+            self.selection_warning_box = QMessageBox(QMessageBox.Icon.Warning, "Selection Error", "",
+                                                     QMessageBox.StandardButton.Ok, self)
+        self.selection_warning_box.setText(message)
+        self.selection_warning_box.exec()
+
+    def _show_error(self, title, message):
+        """Reports a failure in the status bar instead of a modal dialog.
+
+        Stream and database errors can arrive in bursts, and a modal box per error would run a nested event
+        loop each time.
+        """
+        self._show_status(f"{title}: {message}", self.ERROR_MESSAGE_MS)
+
+    def _set_status(self, message):
+        """Queues a status message; the timer only runs while messages keep arriving."""
+        self.pending_status = message
+        if not self.status_timer.isActive():
+            self.status_timer.start()
+
+    def _flush_status(self):
+        if self.pending_status is None:
+            self.status_timer.stop()
+            return
+        self._show_status(self.pending_status)
+        self.pending_status = None
 
     def create_dashboard_tab(self):
         dashboard_tab = QWidget(self)
@@ -153,298 +867,306 @@ class DungeonMasterAssistant(QMainWindow):
         self.entity_sub_tabs = QTabWidget()
         layout.addWidget(self.entity_sub_tabs)
 
-        # Create placeholder widgets for each tab
-        self.monster_tab_content = QWidget()
-        self.item_tab_content = QWidget()
-        self.armor_tab_content = QWidget()
-        self.weapon_tab_content = QWidget()
-        self.spell_tab_content = QWidget()
-        self.npc_tab_content = QWidget()  # New placeholder for NPCs
-
-        self.entity_sub_tabs.addTab(self.monster_tab_content, "Monsters")
-        self.entity_sub_tabs.addTab(self.item_tab_content, "Magic Items")
-        self.entity_sub_tabs.addTab(self.armor_tab_content, "Armor")
-        self.entity_sub_tabs.addTab(self.weapon_tab_content, "Weapons")
-        self.entity_sub_tabs.addTab(self.spell_tab_content, "Spells")
+        for name, cfg in self.ENTITY_TAB_CONFIG.items():
+            tab_content = self.create_entity_sub_tab(name)
+            setattr(self, f"{cfg['attr']}_tab_content", tab_content)
+            self.entity_sub_tabs.addTab(tab_content, name)
+
+        self.npc_tab_content = QWidget()  # Empty until _build_npc_tab fills it on first view
+        self.npc_table = None
+        self.pending_npc_deletes = []  # Rows removed from the table whose DELETE waits out the undo window
+        self.npc_delete_timer = QTimer(self)
+        self.npc_delete_timer.setSingleShot(True)
+        self.npc_delete_timer.setInterval(self.NPC_DELETE_UNDO_MS)
+        self.npc_delete_timer.timeout.connect(self._flush_npc_deletes)
         self.entity_sub_tabs.addTab(self.npc_tab_content, "NPCs")  # Add the tab
 
-        # Refresh all tabs to populate them
-        self._refresh_monster_tab()
-        self._refresh_item_tab()
-        self._refresh_armor_tab()
-        self._refresh_weapon_tab()
-        self._refresh_spell_tab()
-        self._refresh_npc_tab()  # New refresh call for NPCs
+        # Populate each tab the first time it is shown instead of querying all of them up front
+        self.entity_tab_loaders = {
+            "Monsters": self._refresh_monster_tab,
+            "Magic Items": self._refresh_item_tab,
+            "Armor": self._refresh_armor_tab,
+            "Weapons": self._refresh_weapon_tab,
+            "Spells": self._refresh_spell_tab,
+            "NPCs": self._refresh_npc_tab,
+        }
+        self.entity_sub_tabs.currentChanged.connect(self._on_entity_sub_tab_changed)
+        self._on_entity_sub_tab_changed(self.entity_sub_tabs.currentIndex())
 
         self.central_widget.addTab(self.entity_tab_widget, "Entity Management")
 
-    def _replace_entity_tab(self, name, widget, index):
-        current_text = ""
-        if self.entity_sub_tabs.currentIndex() != -1:
-            current_text = self.entity_sub_tabs.tabText(self.entity_sub_tabs.currentIndex())
+    def _on_entity_sub_tab_changed(self, index):
+        """Loads an entity sub-tab from the database on first view."""
+        if index == -1:
+            return
+        name = self.entity_sub_tabs.tabText(index)
+        key = f"entity_tab:{name}"
+        if key in self.tab_initialized:
+            return
+        self.tab_initialized[key] = True
+        self.entity_tab_loaders[name]()
+
+    def _on_main_tab_changed(self, index):
+        title = self.central_widget.tabText(index)
+        if title in self.LAZY_TABS:
+            self._ensure_main_tab(title)
+
+    def _ensure_main_tab(self, title):
+        """Builds a LAZY_TABS tab into its placeholder widget if it has not been built yet."""
+        key = f"main_tab:{title}"
+        if key in self.tab_initialized:
+            return
+        self.tab_initialized[key] = True
+        for index in range(self.central_widget.count()):
+            if self.central_widget.tabText(index) == title:
+                getattr(self, self.LAZY_TABS[title])(self.central_widget.widget(index))
+                return
+
+    def _read_session(self):
+        """Returns the shared read-only session with stale objects expired."""
+        self.db.expire_all()
+        return self.db
+
+    def _get_entity(self, entity, entity_id):
+        """Returns one full entity by id for a detail view.
+
+        Skips the expire_all() of _read_session(), so reopening a row before the next list
+        refresh is served from the session's identity map without any SQL.
+        """
+        return self.db.get(entity, entity_id)
 
-        self.entity_sub_tabs.removeTab(index)
-        self.entity_sub_tabs.insertTab(index, widget, name)
+    def _list_query(self, db_session, entity):
+        """Returns a query over only the columns shown in the entity's list table."""
+        return db_session.query(*self.LIST_COLUMNS[entity])
 
-        if current_text == name:
-            self.entity_sub_tabs.setCurrentIndex(index)
+    def _placement_entities(self, entity_type, party_level):
+        """Returns up to 50 placement candidates of entity_type for the party level.
+
+        Results are cached per entity type and level bucket (monster CR cap, item rarity tier),
+        so repeat placements only query the database after an entity list is reloaded.
+        """
+        cache_key = self._placement_cache_key(entity_type, party_level)
+        entities = self.placement_entity_cache.get(cache_key)
+        if entities is not None:
+            return entities
+
+        logging.debug("Querying %s", entity_type)
+        entities = self._placement_query(self._read_session(), cache_key)
+        if entities:
+            self.placement_entity_cache[cache_key] = entities
+        return entities
+
+    @staticmethod
+    def _placement_cache_key(entity_type, party_level):
+        if entity_type == "Monsters":
+            return entity_type, max(1, party_level // 2)
+        if entity_type == "Magic Items":
+            return entity_type, party_level >= 10
+        return (entity_type,)
+
+    @staticmethod
+    def _placement_query(db_session, cache_key):
+        """Runs the placement candidate query for a _placement_cache_key() key."""
+        entity_type = cache_key[0]
+        # Placement only reads name (and hp for monsters), so skip full ORM instances
+        if entity_type == "Monsters":
+            query = db_session.query(Monster.name, Monster.hp).filter(
+                Monster.cr.in_([str(i) for i in range(1, cache_key[1] + 1)]))
+        elif entity_type == "Magic Items":
+            rarities = ["Common", "Uncommon", "Rare"] + (["Very Rare"] if cache_key[1] else [])
+            query = db_session.query(MagicItem.name).filter(MagicItem.rarity.in_(rarities))
+        elif entity_type == "Armor":
+            query = db_session.query(Armor.name)
+        else:
+            query = db_session.query(Weapon.name)
+        return query.limit(50).all()
+
+    def _prefetch_placement_entities(self):
+        """Warms placement_entity_cache for the entered party level on the thread pool.
+
+        Placement still queries synchronously on a miss, e.g. when it is clicked before a
+        prefetch has landed.
+        """
+        party_level = self.party_level_input.value()
+        for entity_type in self.entity_checkboxes:
+            cache_key = self._placement_cache_key(entity_type, party_level)
+            if cache_key in self.placement_entity_cache:
+                continue
+            runnable = QueryRunnable(lambda db_session, key=cache_key: self._placement_query(db_session, key),
+                                     self.placement_cache_generation)
+            runnable.signals.done.connect(
+                lambda generation, rows, key=cache_key: self._on_placement_prefetched(generation, key, rows))
+            runnable.signals.failed.connect(self._on_placement_prefetch_failed)
+            QThreadPool.globalInstance().start(runnable)
+
+    def _on_placement_prefetched(self, generation, cache_key, rows):
+        # Rows fetched before the cache was last dropped may be stale
+        if generation == self.placement_cache_generation and rows:
+            self.placement_entity_cache.setdefault(cache_key, rows)
+
+    def _on_placement_prefetch_failed(self, generation, error_text):
+        logging.warning(f"Placement prefetch failed: {error_text}")
+
+    def _drop_placement_cache(self):
+        """Forgets cached placement candidates; called whenever an entity list is reloaded."""
+        self.placement_entity_cache.clear()
+        self.placement_cache_generation += 1
 
     def _refresh_monster_tab(self):
-        db_session = SessionLocal()
-        results = db_session.query(Monster).order_by(Monster.name).all()
-        db_session.close()
-        self.monster_tab_content = self.create_entity_sub_tab("Monsters", ["Name", "CR", "HP", "AC"])
+        self._drop_placement_cache()
+        db_session = self._read_session()
+        results = self._list_query(db_session, Monster).order_by(Monster.name).all()
         self._populate_monster_table(results)
-        self._replace_entity_tab("Monsters", self.monster_tab_content, 0)
 
     def _refresh_item_tab(self):
-        db_session = SessionLocal()
-        results = db_session.query(MagicItem).order_by(MagicItem.name).all()
-        db_session.close()
-        self.item_tab_content = self.create_entity_sub_tab("Magic Items", ["Name", "Type", "Rarity"])
+        self._drop_placement_cache()
+        db_session = self._read_session()
+        results = self._list_query(db_session, MagicItem).order_by(MagicItem.name).all()
         self._populate_item_table(results)
-        self._replace_entity_tab("Magic Items", self.item_tab_content, 1)
 
     def _refresh_armor_tab(self):
-        db_session = SessionLocal()
-        results = db_session.query(Armor).order_by(Armor.name).all()
-        db_session.close()
-        self.armor_tab_content = self.create_entity_sub_tab("Armor", ["Name", "Category", "AC"])
+        self._drop_placement_cache()
+        db_session = self._read_session()
+        results = self._list_query(db_session, Armor).order_by(Armor.name).all()
         self._populate_armor_table(results)
-        self._replace_entity_tab("Armor", self.armor_tab_content, 2)
 
     def _refresh_weapon_tab(self):
-        db_session = SessionLocal()
-        results = db_session.query(Weapon).order_by(Weapon.name).all()
-        db_session.close()
-        self.weapon_tab_content = self.create_entity_sub_tab("Weapons", ["Name", "Category", "Damage"])
+        self._drop_placement_cache()
+        db_session = self._read_session()
+        results = self._list_query(db_session, Weapon).order_by(Weapon.name).all()
         self._populate_weapon_table(results)
-        self._replace_entity_tab("Weapons", self.weapon_tab_content, 3)
 
     def _refresh_spell_tab(self):
-        db_session = SessionLocal()
-        results = db_session.query(Spell).order_by(Spell.level_int, Spell.name).all()
-        db_session.close()
-        self.spell_tab_content = self.create_entity_sub_tab("Spells", ["Name", "Level", "School"])
+        db_session = self._read_session()
+        results = self._list_query(db_session, Spell).order_by(Spell.level_int, Spell.name).all()
         self._populate_spell_table(results)
-        self._replace_entity_tab("Spells", self.spell_tab_content, 4)
 
-    def create_entity_sub_tab(self, name, headers, data=None):
+    def create_entity_sub_tab(self, name):
+        """Builds one entity sub-tab from its ENTITY_TAB_CONFIG entry."""
+        cfg = self.ENTITY_TAB_CONFIG[name]
         widget = QWidget()
         layout = QVBoxLayout(widget)
 
-        table = QTableWidget(0, len(headers))
-        table.setHorizontalHeaderLabels(headers)
-        table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-
-        if name == "Monsters":
-            self.monster_table = table
-            table.itemDoubleClicked.connect(self._show_monster_details)
-            api_group = QGroupBox("Monster Database")
-            api_layout = QHBoxLayout()
-            self.monster_search_input = QLineEdit()
-            self.monster_search_input.setPlaceholderText("Search local monsters by name...")
-            search_button = QPushButton("Search")
-            search_button.clicked.connect(self._on_local_search_clicked)
-            filter_button = QPushButton("Advanced Filter...")
-            filter_button.clicked.connect(self._open_filter_dialog)
-            import_button = QPushButton("Import All SRD Monsters")
-            import_button.setObjectName("import_all_button")
-            import_button.clicked.connect(self._on_import_all_monsters_clicked)
-            api_layout.addWidget(self.monster_search_input)
-            api_layout.addWidget(search_button)
-            api_layout.addWidget(filter_button)
-            api_layout.addWidget(import_button)
-            api_layout.addStretch()
-            api_group.setLayout(api_layout)
-            layout.addWidget(api_group)
-        elif name == "Magic Items":
-            self.item_table = table
-            table.itemDoubleClicked.connect(self._show_magic_item_details)
-            controls_group = QGroupBox("Magic Item Database")
-            controls_layout = QHBoxLayout()
-            filter_button = QPushButton("Advanced Filter...")
-            filter_button.clicked.connect(self._open_item_filter_dialog)
-            import_button = QPushButton("Import All SRD Magic Items")
-            import_button.setObjectName("import_all_button")
-            import_button.clicked.connect(self._on_import_all_magic_items_clicked)
-            controls_layout.addWidget(filter_button)
-            controls_layout.addWidget(import_button)
-            controls_layout.addStretch()
-            controls_group.setLayout(controls_layout)
-            layout.addWidget(controls_group)
-        elif name == "Armor":
-            self.armor_table = table
-            table.itemDoubleClicked.connect(self._show_armor_details)
-            controls_group = QGroupBox("Armor Database")
-            controls_layout = QHBoxLayout()
-            filter_button = QPushButton("Advanced Filter...")
-            filter_button.clicked.connect(self._open_armor_filter_dialog)
-            import_button = QPushButton("Import All SRD Armor")
-            import_button.setObjectName("import_all_button")
-            import_button.clicked.connect(self._on_import_all_armor_clicked)
-            controls_layout.addWidget(filter_button)
-            controls_layout.addWidget(import_button)
-            controls_layout.addStretch()
-            controls_group.setLayout(controls_layout)
-            layout.addWidget(controls_group)
-        elif name == "Weapons":
-            self.weapon_table = table
-            table.itemDoubleClicked.connect(self._show_weapon_details)
-            controls_group = QGroupBox("Weapon Database")
-            controls_layout = QHBoxLayout()
-            filter_button = QPushButton("Advanced Filter...")
-            filter_button.clicked.connect(self._open_weapon_filter_dialog)
-            import_button = QPushButton("Import All SRD Weapons")
-            import_button.setObjectName("import_all_button")
-            import_button.clicked.connect(self._on_import_all_weapons_clicked)
-            controls_layout.addWidget(filter_button)
-            controls_layout.addWidget(import_button)
-            controls_layout.addStretch()
-            controls_group.setLayout(controls_layout)
-            layout.addWidget(controls_group)
-        elif name == "Spells":
-            self.spell_table = table
-            table.itemDoubleClicked.connect(self._show_spell_details)
-            controls_group = QGroupBox("Spell Database")
-            controls_layout = QHBoxLayout()
-            self.spell_search_input = QLineEdit()
-            self.spell_search_input.setPlaceholderText("Search local spells by name...")
+        model = EntityTableModel(cfg["columns"], parent=widget)
+        table = QTableView()
+        table.setModel(model)
+        table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
+        table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        table.doubleClicked.connect(getattr(self, cfg["details_slot"]))
+        setattr(self, f"{cfg['attr']}_table", table)
+        setattr(self, f"{cfg['attr']}_model", model)
+
+        controls_group = QGroupBox(cfg["group"])
+        controls_layout = QHBoxLayout()
+        if "search_slot" in cfg:
+            search_input = QLineEdit()
+            search_input.setPlaceholderText(cfg["search_placeholder"])
+            setattr(self, f"{cfg['attr']}_search_input", search_input)
+            # Search as the user types, but only once typing pauses
+            search_timer = QTimer(widget)
+            search_timer.setSingleShot(True)
+            search_timer.setInterval(self.SEARCH_DEBOUNCE_MS)
+            search_timer.timeout.connect(getattr(self, cfg["search_slot"]))
+            search_input.textChanged.connect(lambda _: search_timer.start())
+            search_input.returnPressed.connect(search_timer.stop)
+            search_input.returnPressed.connect(getattr(self, cfg["search_slot"]))
+            setattr(self, f"{cfg['attr']}_search_timer", search_timer)
             search_button = QPushButton("Search")
-            search_button.clicked.connect(self._on_local_spell_search_clicked)
-            filter_button = QPushButton("Advanced Filter...")
-            filter_button.clicked.connect(self._open_spell_filter_dialog)
-            import_button = QPushButton("Import All SRD Spells")
-            import_button.setObjectName("import_all_button")
-            import_button.clicked.connect(self._on_import_all_spells_clicked)
-            controls_layout.addWidget(self.spell_search_input)
+            search_button.clicked.connect(search_timer.stop)
+            search_button.clicked.connect(getattr(self, cfg["search_slot"]))
+            controls_layout.addWidget(search_input)
             controls_layout.addWidget(search_button)
-            controls_layout.addWidget(filter_button)
-            controls_layout.addWidget(import_button)
-            controls_layout.addStretch()
-            controls_group.setLayout(controls_layout)
-            layout.addWidget(controls_group)
+        filter_button = QPushButton("Advanced Filter...")
+        filter_button.clicked.connect(getattr(self, cfg["filter_slot"]))
+        import_button = QPushButton(cfg["import_label"])
+        import_button.setObjectName("import_all_button")
+        import_button.clicked.connect(getattr(self, cfg["import_slot"]))
+        controls_layout.addWidget(filter_button)
+        controls_layout.addWidget(import_button)
+        controls_layout.addStretch()
+        controls_group.setLayout(controls_layout)
+        layout.addWidget(controls_group)
 
         layout.addWidget(table)  # Add the table to the layout AFTER all controls
 
-        if data:
-            table.setRowCount(len(data))
-            for row_num, row_data in enumerate(data):
-                for col_num, header in enumerate(headers):
-                    table.setItem(row_num, col_num, QTableWidgetItem(str(row_data.get(header.lower(), ""))))
-
         return widget
 
     def _populate_spell_table(self, spells):
-        self.spell_table.setRowCount(0)
-        self.spell_table.setRowCount(len(spells))
-        for row_num, spell in enumerate(spells):
-            self.spell_table.setItem(row_num, 0, QTableWidgetItem(spell.name))
-            self.spell_table.setItem(row_num, 1, QTableWidgetItem(spell.level_str))
-            self.spell_table.setItem(row_num, 2, QTableWidgetItem(spell.school))
+        self.spell_model.set_rows(spells)
 
     def _populate_armor_table(self, armors):
-        self.armor_table.setRowCount(0)
-        self.armor_table.setRowCount(len(armors))
-        for row_num, armor in enumerate(armors):
-            self.armor_table.setItem(row_num, 0, QTableWidgetItem(armor.name))
-            self.armor_table.setItem(row_num, 1, QTableWidgetItem(armor.category))
-            self.armor_table.setItem(row_num, 2, QTableWidgetItem(armor.ac_string))
+        self.armor_model.set_rows(armors)
 
     def _populate_weapon_table(self, weapons):
-        self.weapon_table.setRowCount(0)
-        self.weapon_table.setRowCount(len(weapons))
-        for row_num, weapon in enumerate(weapons):
-            self.weapon_table.setItem(row_num, 0, QTableWidgetItem(weapon.name))
-            self.weapon_table.setItem(row_num, 1, QTableWidgetItem(weapon.category))
-            self.weapon_table.setItem(row_num, 2, QTableWidgetItem(f"{weapon.damage_dice} {weapon.damage_type}"))
+        self.weapon_model.set_rows(weapons)
 
     def _populate_monster_table(self, monsters):
-        self.monster_table.setRowCount(0)
-        self.monster_table.setRowCount(len(monsters))
-        for row_num, monster in enumerate(monsters):
-            self.monster_table.setItem(row_num, 0, QTableWidgetItem(monster.name))
-            self.monster_table.setItem(row_num, 1, QTableWidgetItem(monster.cr))
-            self.monster_table.setItem(row_num, 2, QTableWidgetItem(monster.hp))
-            self.monster_table.setItem(row_num, 3, QTableWidgetItem(monster.ac))
+        self.monster_model.set_rows(monsters)
 
     def _populate_item_table(self, items):
-        self.item_table.setRowCount(0)
-        self.item_table.setRowCount(len(items))
-        for row_num, item in enumerate(items):
-            self.item_table.setItem(row_num, 0, QTableWidgetItem(item.name))
-            self.item_table.setItem(row_num, 1, QTableWidgetItem(item.type))
-            self.item_table.setItem(row_num, 2, QTableWidgetItem(item.rarity))
+        self.item_model.set_rows(items)
+
+    def _filter_dialog(self, dialog_class):
+        """Returns the cached instance of a filter dialog, building it on first use."""
+        dialog = self.filter_dialogs.get(dialog_class)
+        if dialog is None:
+            dialog = self.filter_dialogs[dialog_class] = dialog_class(self)
+        return dialog
+
+    def _drop_filter_dialog(self, dialog_class):
+        """Discards a cached filter dialog so its choices are rebuilt from the database after an import."""
+        dialog = self.filter_dialogs.pop(dialog_class, None)
+        if dialog is not None:
+            dialog.deleteLater()
 
     def _open_item_filter_dialog(self):
-        dialog = FilterMagicItemDialog(self)
+        dialog = self._filter_dialog(FilterMagicItemDialog)
         if dialog.exec() == QDialog.DialogCode.Accepted:
             filters = dialog.get_filters()
             self._apply_item_filter(filters)
 
     def _open_weapon_filter_dialog(self):
-        dialog = FilterWeaponDialog(self)
+        dialog = self._filter_dialog(FilterWeaponDialog)
         if dialog.exec() == QDialog.DialogCode.Accepted:
             filters = dialog.get_filters()
             self._apply_weapon_filter(filters)
 
     def _open_armor_filter_dialog(self):
-        dialog = FilterArmorDialog(self)
+        dialog = self._filter_dialog(FilterArmorDialog)
         if dialog.exec() == QDialog.DialogCode.Accepted:
             filters = dialog.get_filters()
             self._apply_armor_filter(filters)
 
     def _open_spell_filter_dialog(self):
-        dialog = FilterSpellDialog(self)
+        dialog = self._filter_dialog(FilterSpellDialog)
         if dialog.exec() == QDialog.DialogCode.Accepted:
             filters = dialog.get_filters()
             self._apply_spell_filter(filters)
 
+    def _filter_clauses(self, entity, filters):
+        """Builds equality clauses for an Advanced Filter dialog result, applied in a single filter() call."""
+        return [getattr(entity, key) == value for key, value in (filters or {}).items()]
+
     def _apply_spell_filter(self, filters):
-        db_session = SessionLocal()
-        try:
-            query = db_session.query(Spell)
-            if not filters:
-                results = query.order_by(Spell.level_int, Spell.name).all()
-            else:
-                for key, value in filters.items():
-                    query = query.filter(getattr(Spell, key) == value)
-                results = query.order_by(Spell.level_int, Spell.name).all()
-            self._populate_spell_table(results)
-            self.statusBar().showMessage(f"Found {len(results)} spells matching filter.")
-        finally:
-            db_session.close()
+        db_session = self._read_session()
+        clauses = self._filter_clauses(Spell, filters)
+        results = self._list_query(db_session, Spell).filter(*clauses).order_by(Spell.level_int, Spell.name).all()
+        self._populate_spell_table(results)
+        self._show_status(f"Found {len(results)} spells matching filter.")
 
     def _apply_armor_filter(self, filters):
-        db_session = SessionLocal()
-        try:
-            query = db_session.query(Armor)
-            if not filters:
-                results = query.order_by(Armor.name).all()
-            else:
-                for key, value in filters.items():
-                    query = query.filter(getattr(Armor, key) == value)
-                results = query.order_by(Armor.name).all()
-            self._populate_armor_table(results)
-            self.statusBar().showMessage(f"Found {len(results)} armors matching filter.")
-        finally:
-            db_session.close()
+        db_session = self._read_session()
+        clauses = self._filter_clauses(Armor, filters)
+        results = self._list_query(db_session, Armor).filter(*clauses).order_by(Armor.name).all()
+        self._populate_armor_table(results)
+        self._show_status(f"Found {len(results)} armors matching filter.")
 
     def _apply_weapon_filter(self, filters):
-        db_session = SessionLocal()
-        try:
-            query = db_session.query(Weapon)
-            if not filters:
-                results = query.order_by(Weapon.name).all()
-            else:
-                for key, value in filters.items():
-                    query = query.filter(getattr(Weapon, key) == value)
-                results = query.order_by(Weapon.name).all()
-            self._populate_weapon_table(results)
-            self.statusBar().showMessage(f"Found {len(results)} weapons matching filter.")
-        finally:
-            db_session.close()
+        db_session = self._read_session()
+        clauses = self._filter_clauses(Weapon, filters)
+        results = self._list_query(db_session, Weapon).filter(*clauses).order_by(Weapon.name).all()
+        self._populate_weapon_table(results)
+        self._show_status(f"Found {len(results)} weapons matching filter.")
 
     def _on_import_all_armor_clicked(self):
         reply = QMessageBox.question(self, "Bulk Import",
@@ -454,17 +1176,19 @@ class DungeonMasterAssistant(QMainWindow):
             return
         self.armor_tab_content.findChild(QPushButton, "import_all_button").setEnabled(False)
         self.armor_importer_worker = ArmorImporterWorker()
-        self.armor_importer_worker.progress.connect(self.statusBar().showMessage)
+        self.armor_importer_worker.progress.connect(self._set_status)
         self.armor_importer_worker.finished.connect(self._on_armor_import_finished)
         self.armor_importer_worker.start()
 
     def _on_armor_import_finished(self, count, error_msg):
+        self._flush_status()  # Show the last progress message now so it cannot overwrite the result
         if error_msg:
             QMessageBox.critical(self, "Import Error", f"An error occurred during import:\n{error_msg}")
-            self.statusBar().showMessage("Import failed.")
+            self._show_status("Import failed.")
         else:
             QMessageBox.information(self, "Import Complete", f"Successfully imported {count} new armors.")
-            self.statusBar().showMessage("Import complete.")
+            self._show_status("Import complete.")
+            self._drop_filter_dialog(FilterArmorDialog)
             self._refresh_armor_tab()
         self.armor_tab_content.findChild(QPushButton, "import_all_button").setEnabled(True)
 
@@ -477,55 +1201,46 @@ class DungeonMasterAssistant(QMainWindow):
 
         self.spell_tab_content.findChild(QPushButton, "import_all_button").setEnabled(False)
         self.spell_importer_worker = SpellImporterWorker()
-        self.spell_importer_worker.progress.connect(self.statusBar().showMessage)
+        self.spell_importer_worker.progress.connect(self._set_status)
         self.spell_importer_worker.finished.connect(self._on_spell_import_finished)
         self.spell_importer_worker.start()
 
     def _on_spell_import_finished(self, count, error_msg):
+        self._flush_status()  # Show the last progress message now so it cannot overwrite the result
         if error_msg:
             QMessageBox.critical(self, "Import Error", f"An error occurred during import:\n{error_msg}")
-            self.statusBar().showMessage("Import failed.")
+            self._show_status("Import failed.")
         else:
             QMessageBox.information(self, "Import Complete", f"Successfully imported {count} new spells.")
-            self.statusBar().showMessage("Import complete.")
+            self._show_status("Import complete.")
+            self._drop_filter_dialog(FilterSpellDialog)
             self._refresh_spell_tab()
 
         self.spell_tab_content.findChild(QPushButton, "import_all_button").setEnabled(True)
 
-    def _show_armor_details(self, item: QTableWidgetItem):
-        row = item.row()
-        item_name_item = self.armor_table.item(row, 0)
-        if not item_name_item:
+    def _show_armor_details(self, index: QModelIndex):
+        if not index.isValid():
             return
-        item_name = item_name_item.text()
-        db_session = SessionLocal()
-        try:
-            armor_item = db_session.query(Armor).filter(Armor.name == item_name).first()
-            if armor_item:
-                dialog = ArmorDetailDialog(armor_item, self)
-                dialog.exec()
-            else:
-                QMessageBox.warning(self, "Not Found", f"Could not find details for '{item_name}' in the database.")
-        finally:
-            db_session.close()
+        row = self.armor_model.row_at(index.row())
+        item_name = row.name
+        armor_item = self._get_entity(Armor, row.id)
+        if armor_item:
+            dialog = ArmorDetailDialog(armor_item, self)
+            dialog.exec()
+        else:
+            QMessageBox.warning(self, "Not Found", f"Could not find details for '{item_name}' in the database.")
 
-    def _show_spell_details(self, item: QTableWidgetItem):
-        item_table = self.sender()
-        row = item.row()
-        item_name_item = item_table.item(row, 0)
-        if not item_name_item:
+    def _show_spell_details(self, index: QModelIndex):
+        if not index.isValid():
             return
-        item_name = item_name_item.text()
-        db_session = SessionLocal()
-        try:
-            spell_item = db_session.query(Spell).filter(Spell.name == item_name).first()
-            if spell_item:
-                dialog = SpellDetailDialog(spell_item, self)
-                dialog.exec()
-            else:
-                QMessageBox.warning(self, "Not Found", f"Could not find details for '{item_name}' in the database.")
-        finally:
-            db_session.close()
+        row = self.spell_model.row_at(index.row())
+        item_name = row.name
+        spell_item = self._get_entity(Spell, row.id)
+        if spell_item:
+            dialog = SpellDetailDialog(spell_item, self)
+            dialog.exec()
+        else:
+            QMessageBox.warning(self, "Not Found", f"Could not find details for '{item_name}' in the database.")
 
     def _on_import_all_weapons_clicked(self):
         reply = QMessageBox.question(self, "Bulk Import",
@@ -536,84 +1251,63 @@ class DungeonMasterAssistant(QMainWindow):
 
         self.weapon_tab_content.findChild(QPushButton, "import_all_button").setEnabled(False)
         self.weapon_importer_worker = WeaponImporterWorker()
-        self.weapon_importer_worker.progress.connect(self.statusBar().showMessage)
+        self.weapon_importer_worker.progress.connect(self._set_status)
         self.weapon_importer_worker.finished.connect(self._on_weapon_import_finished)
         self.weapon_importer_worker.start()
 
     def _on_weapon_import_finished(self, count, error_msg):
+        self._flush_status()  # Show the last progress message now so it cannot overwrite the result
         if error_msg:
             QMessageBox.critical(self, "Import Error", f"An error occurred during import:\n{error_msg}")
-            self.statusBar().showMessage("Import failed.")
+            self._show_status("Import failed.")
         else:
             QMessageBox.information(self, "Import Complete", f"Successfully imported {count} new weapons.")
-            self.statusBar().showMessage("Import complete.")
+            self._show_status("Import complete.")
+            self._drop_filter_dialog(FilterWeaponDialog)
             self._refresh_weapon_tab()
 
         self.weapon_tab_content.findChild(QPushButton, "import_all_button").setEnabled(True)
 
     def _apply_item_filter(self, filters):
-        db_session = SessionLocal()
-        try:
-            query = db_session.query(MagicItem)
-            if not filters:
-                results = query.order_by(MagicItem.name).all()
+        db_session = self._read_session()
+        filters = dict(filters or {})
+        clauses = []
+        if 'requires_attunement' in filters:
+            if filters.pop('requires_attunement'):
+                clauses.append(MagicItem.requires_attunement.isnot(None) & (MagicItem.requires_attunement != ""))
             else:
-                for key, value in filters.items():
-                    if key == 'requires_attunement':
-                        if value:
-                            query = query.filter(
-                                MagicItem.requires_attunement.isnot(None) & (MagicItem.requires_attunement != ""))
-                        else:
-                            query = query.filter(
-                                MagicItem.requires_attunement.is_(None) | (MagicItem.requires_attunement == ""))
-                    else:
-                        query = query.filter(getattr(MagicItem, key) == value)
-                results = query.order_by(MagicItem.name).all()
-
-            self._populate_item_table(results)
-            self.statusBar().showMessage(f"Found {len(results)} items matching filter.")
-        finally:
-            db_session.close()
+                clauses.append(MagicItem.requires_attunement.is_(None) | (MagicItem.requires_attunement == ""))
+        clauses.extend(self._filter_clauses(MagicItem, filters))
+        results = self._list_query(db_session, MagicItem).filter(*clauses).order_by(MagicItem.name).all()
+
+        self._populate_item_table(results)
+        self._show_status(f"Found {len(results)} items matching filter.")
 
     def _open_filter_dialog(self):
-        dialog = FilterMonsterDialog(self)
+        dialog = self._filter_dialog(FilterMonsterDialog)
         if dialog.exec() == QDialog.DialogCode.Accepted:
             filters = dialog.get_filters()
             self._apply_monster_filter(filters)
 
     def _apply_monster_filter(self, filters):
-        db_session = SessionLocal()
-        try:
-            query = db_session.query(Monster)
-            if not filters:
-                results = query.order_by(Monster.name).all()
-            else:
-                for key, value in filters.items():
-                    query = query.filter(getattr(Monster, key) == value)
-                results = query.order_by(Monster.name).all()
+        db_session = self._read_session()
+        clauses = self._filter_clauses(Monster, filters)
+        results = self._list_query(db_session, Monster).filter(*clauses).order_by(Monster.name).all()
 
-            self._populate_monster_table(results)
-            self.statusBar().showMessage(f"Found {len(results)} monsters matching filter.")
-        finally:
-            db_session.close()
+        self._populate_monster_table(results)
+        self._show_status(f"Found {len(results)} monsters matching filter.")
 
-    def _show_weapon_details(self, item: QTableWidgetItem):
-        item_table = self.sender()
-        row = item.row()
-        item_name_item = item_table.item(row, 0)
-        if not item_name_item:
+    def _show_weapon_details(self, index: QModelIndex):
+        if not index.isValid():
             return
-        item_name = item_name_item.text()
-        db_session = SessionLocal()
-        try:
-            weapon_item = db_session.query(Weapon).filter(Weapon.name == item_name).first()
-            if weapon_item:
-                dialog = WeaponDetailDialog(weapon_item, self)
-                dialog.exec()
-            else:
-                QMessageBox.warning(self, "Not Found", f"Could not find details for '{item_name}' in the database.")
-        finally:
-            db_session.close()
+        row = self.weapon_model.row_at(index.row())
+        item_name = row.name
+        weapon_item = self._get_entity(Weapon, row.id)
+        if weapon_item:
+            dialog = WeaponDetailDialog(weapon_item, self)
+            dialog.exec()
+        else:
+            QMessageBox.warning(self, "Not Found", f"Could not find details for '{item_name}' in the database.")
 
     def _open_new_monster_dialog(self):
         dialog = AddMonsterDialog(self)
@@ -627,7 +1321,7 @@ class DungeonMasterAssistant(QMainWindow):
             try:
                 db_session.add(new_monster)
                 db_session.commit()
-                self.statusBar().showMessage(f"Monster '{data['name']}' saved successfully.")
+                self._show_status(f"Monster '{data['name']}' saved successfully.")
             except Exception as e:
                 db_session.rollback()
                 QMessageBox.critical(self, "Database Error", f"Could not save monster:\n{e}")
@@ -637,34 +1331,44 @@ class DungeonMasterAssistant(QMainWindow):
 
     def _on_local_search_clicked(self):
         search_term = self.monster_search_input.text().strip()
-        db_session = SessionLocal()
-        try:
-            if not search_term:
-                results = db_session.query(Monster).order_by(Monster.name).all()
-            else:
-                search_pattern = f"%{search_term}%"
-                results = db_session.query(Monster).filter(Monster.name.ilike(search_pattern)).order_by(
-                    Monster.name).all()
-            self._populate_monster_table(results)
-            self.statusBar().showMessage(f"Found {len(results)} matching monsters.")
-        finally:
-            db_session.close()
+        self._start_search(Monster, search_term, (Monster.name,), self._on_monster_search_done)
+
+    def _on_monster_search_done(self, generation, results):
+        if generation != self.search_generations[Monster]:
+            return  # Superseded by a newer search
+        self._populate_monster_table(results)
+        self._show_status(f"Found {len(results)} matching monsters.")
 
     def _on_local_spell_search_clicked(self):
         """Handles searching the local database for spells."""
         search_term = self.spell_search_input.text().strip()
-        db_session = SessionLocal()
-        try:
-            if not search_term:
-                results = db_session.query(Spell).order_by(Spell.level_int, Spell.name).all()
-            else:
-                search_pattern = f"%{search_term}%"
-                results = db_session.query(Spell).filter(Spell.name.ilike(search_pattern)).order_by(Spell.level_int,
-                                                                                                    Spell.name).all()
-            self._populate_spell_table(results)
-            self.statusBar().showMessage(f"Found {len(results)} matching spells.")
-        finally:
-            db_session.close()
+        self._start_search(Spell, search_term, (Spell.level_int, Spell.name), self._on_spell_search_done)
+
+    def _on_spell_search_done(self, generation, results):
+        if generation != self.search_generations[Spell]:
+            return  # Superseded by a newer search
+        self._populate_spell_table(results)
+        self._show_status(f"Found {len(results)} matching spells.")
+
+    def _start_search(self, entity, search_term, order_by, on_done):
+        """Runs an indexed name search for entity off the GUI thread and delivers the rows to on_done."""
+        generation = self.search_generations.get(entity, 0) + 1
+        self.search_generations[entity] = generation
+
+        def query(db_session):
+            search_query = self._list_query(db_session, entity)
+            if search_term:
+                search_query = search_query.filter(self._name_search_clause(entity, search_term))
+            return search_query.order_by(*order_by).all()
+
+        runnable = QueryRunnable(query, generation)
+        runnable.signals.done.connect(on_done)
+        runnable.signals.failed.connect(self._on_search_failed)
+        QThreadPool.globalInstance().start(runnable)
+
+    def _on_search_failed(self, generation, error_text):
+        logging.warning(f"Search failed: {error_text}")
+        self._show_status(f"Search failed: {error_text}")
 
     def _on_import_all_monsters_clicked(self):
         reply = QMessageBox.question(self, "Bulk Import",
@@ -677,7 +1381,7 @@ class DungeonMasterAssistant(QMainWindow):
 
         self.monster_tab_content.findChild(QPushButton, "import_all_button").setEnabled(False)
         self.monster_importer_worker = MonsterImporterWorker()
-        self.monster_importer_worker.progress.connect(self.statusBar().showMessage)
+        self.monster_importer_worker.progress.connect(self._set_status)
         self.monster_importer_worker.finished.connect(self._on_import_finished)
         self.monster_importer_worker.start()
 
@@ -690,74 +1394,61 @@ class DungeonMasterAssistant(QMainWindow):
 
         self.item_tab_content.findChild(QPushButton, "import_all_button").setEnabled(False)
         self.magic_item_importer_worker = MagicItemImporterWorker()
-        self.magic_item_importer_worker.progress.connect(self.statusBar().showMessage)
+        self.magic_item_importer_worker.progress.connect(self._set_status)
         self.magic_item_importer_worker.finished.connect(self._on_magic_item_import_finished)
         self.magic_item_importer_worker.start()
 
     def _on_magic_item_import_finished(self, count, error_msg):
+        self._flush_status()  # Show the last progress message now so it cannot overwrite the result
         if error_msg:
             QMessageBox.critical(self, "Import Error", f"An error occurred during import:\n{error_msg}")
-            self.statusBar().showMessage("Import failed.")
+            self._show_status("Import failed.")
         else:
             QMessageBox.information(self, "Import Complete", f"Successfully imported {count} new magic items.")
-            self.statusBar().showMessage("Import complete.")
+            self._show_status("Import complete.")
+            self._drop_filter_dialog(FilterMagicItemDialog)
             self._refresh_item_tab()
 
         self.item_tab_content.findChild(QPushButton, "import_all_button").setEnabled(True)
 
     def _on_import_finished(self, count, error_msg):
+        self._flush_status()  # Show the last progress message now so it cannot overwrite the result
         if error_msg:
             QMessageBox.critical(self, "Import Error", f"An error occurred during import:\n{error_msg}")
-            self.statusBar().showMessage("Import failed.")
+            self._show_status("Import failed.")
         else:
             QMessageBox.information(self, "Import Complete", f"Successfully imported {count} new monsters.")
-            self.statusBar().showMessage("Import complete.")
+            self._show_status("Import complete.")
+            self._drop_filter_dialog(FilterMonsterDialog)
             self._refresh_monster_tab()
 
         self.monster_tab_content.findChild(QPushButton, "import_all_button").setEnabled(True)
 
-    def _show_monster_details(self, item: QTableWidgetItem):
-        monster_table = self.sender()
-        if not isinstance(monster_table, QTableWidget):
-            return
-
-        row = item.row()
-        monster_name_item = monster_table.item(row, 0)
-        if not monster_name_item:
+    def _show_monster_details(self, index: QModelIndex):
+        if not index.isValid():
             return
 
-        monster_name = monster_name_item.text()
+        row = self.monster_model.row_at(index.row())
+        monster_name = row.name
 
-        db_session = SessionLocal()
-        try:
-            monster = db_session.query(Monster).filter(Monster.name == monster_name).first()
-            if monster:
-                dialog = MonsterDetailDialog(monster, self)
-                dialog.exec()
-            else:
-                QMessageBox.warning(self, "Not Found", f"Could not find details for '{monster_name}' in the database.")
-        finally:
-            db_session.close()
+        monster = self._get_entity(Monster, row.id)
+        if monster:
+            dialog = MonsterDetailDialog(monster, self)
+            dialog.exec()
+        else:
+            QMessageBox.warning(self, "Not Found", f"Could not find details for '{monster_name}' in the database.")
 
-    def _show_magic_item_details(self, item: QTableWidgetItem):
-        item_table = self.sender()
-        if not isinstance(item_table, QTableWidget):
+    def _show_magic_item_details(self, index: QModelIndex):
+        if not index.isValid():
             return
-        row = item.row()
-        item_name_item = item_table.item(row, 0)
-        if not item_name_item:
-            return
-        item_name = item_name_item.text()
-        db_session = SessionLocal()
-        try:
-            magic_item = db_session.query(MagicItem).filter(MagicItem.name == item_name).first()
-            if magic_item:
-                dialog = MagicItemDetailDialog(magic_item, self)
-                dialog.exec()
-            else:
-                QMessageBox.warning(self, "Not Found", f"Could not find details for '{item_name}' in the database.")
-        finally:
-            db_session.close()
+        row = self.item_model.row_at(index.row())
+        item_name = row.name
+        magic_item = self._get_entity(MagicItem, row.id)
+        if magic_item:
+            dialog = MagicItemDetailDialog(magic_item, self)
+            dialog.exec()
+        else:
+            QMessageBox.warning(self, "Not Found", f"Could not find details for '{item_name}' in the database.")
 
     # --- Combat Tracker Methods ---
     def add_combatant(self, name, hp, initiative=None):
@@ -771,26 +1462,16 @@ class DungeonMasterAssistant(QMainWindow):
         logging.debug(f"Adding combatant: {name}, HP: {hp}, Initiative: {initiative}")
 
         try:
-            if not hasattr(self, "initiative_table") or self.initiative_table is None:
+            if not hasattr(self, "initiative_model") or self.initiative_model is None:
                 logging.error("Initiative table not initialized")
                 return
 
             if initiative is None:
-                initiative = random.randint(1, 20)
+                initiative = self._roll_d20()
 
-            row_position = self.initiative_table.rowCount()
-            self.initiative_table.insertRow(row_position)
+            self.initiative_model.append_row({"name": name, "initiative": initiative, "hp": hp})
 
-            name_item = QTableWidgetItem(name)
-            init_item = QTableWidgetItem()
-            init_item.setData(Qt.ItemDataRole.DisplayRole, initiative)
-            hp_item = QTableWidgetItem(str(hp))
-
-            self.initiative_table.setItem(row_position, 0, name_item)
-            self.initiative_table.setItem(row_position, 1, init_item)
-            self.initiative_table.setItem(row_position, 2, hp_item)
-
-            self.ailments[name] = []  # Initialize ailments for combatant
+            self.ailments[name] = {}  # Initialize ailments for combatant
             self._append_to_combat_log(f"Added {name} (HP: {hp}, Initiative: {initiative}) to combat.")
 
             logging.debug(f"Combatant {name} added successfully")
@@ -801,22 +1482,15 @@ class DungeonMasterAssistant(QMainWindow):
     def _add_combatant_from_input(self):
         """Add a combatant from user input fields."""
         name = self.name_input.text().strip()
-        hp = self.hp_input.text().strip()
-        initiative = self.initiative_input.text().strip()
-
-        if not name or not hp:
-            QMessageBox.warning(self, "Input Error", "Name and HP are required.")
+        if not name:
+            QMessageBox.warning(self, "Input Error", "Name is required.")
             return
 
-        try:
-            hp = int(hp)
-            initiative = int(initiative) if initiative else None
-            self.add_combatant(name, hp, initiative)
-            self.name_input.clear()
-            self.hp_input.clear()
-            self.initiative_input.clear()
-        except ValueError:
-            QMessageBox.warning(self, "Input Error", "HP and Initiative must be numeric.")
+        initiative = self.initiative_input.value() or None  # 0 is the "roll for me" special value
+        self.add_combatant(name, self.hp_input.value(), initiative)
+        self.name_input.clear()
+        self.hp_input.setValue(self.hp_input.minimum())
+        self.initiative_input.setValue(self.initiative_input.minimum())
 
     def add_combatant(self, name, hp, initiative=None):
         """Add a combatant to the initiative table.
@@ -829,30 +1503,19 @@ class DungeonMasterAssistant(QMainWindow):
         logging.debug(f"Adding combatant: {name}, HP: {hp}, Initiative: {initiative}")
 
         try:
-            if not hasattr(self, "initiative_table") or self.initiative_table is None:
+            if not hasattr(self, "initiative_model") or self.initiative_model is None:
                 logging.error("Initiative table not initialized")
                 return
 
             if initiative is None:
-                initiative = random.randint(1, 20)
+                initiative = self._roll_d20()
 
             # Add to initiative table
-            row_position = self.initiative_table.rowCount()
-            self.initiative_table.insertRow(row_position)
-
-            name_item = QTableWidgetItem(name)
-            init_item = QTableWidgetItem()
-            init_item.setData(Qt.ItemDataRole.DisplayRole, initiative)
-            hp_item = QTableWidgetItem(str(hp))
-            ailment_item = QTableWidgetItem("")
-
-            self.initiative_table.setItem(row_position, 0, name_item)
-            self.initiative_table.setItem(row_position, 1, init_item)
-            self.initiative_table.setItem(row_position, 2, hp_item)
-            self.initiative_table.setItem(row_position, 3, ailment_item)
+            self.initiative_model.append_row({"name": name, "initiative": initiative, "hp": hp})
 
             # Initialize ailments
-            self.ailments[name] = []
+            self.ailments[name] = {}
+            self.combat_state_dirty = True
 
             logging.debug(f"Combatant {name} added successfully")
         except Exception as e:
@@ -862,28 +1525,24 @@ class DungeonMasterAssistant(QMainWindow):
         """Remove selected combatants from the initiative table."""
         selected_rows = self.initiative_table.selectionModel().selectedRows()
         if not selected_rows:
-            QMessageBox.warning(self, "Selection Error", "No combatant selected to remove.")
+            self._warn_selection("No combatant selected to remove.")
             return
 
         combatant_names_to_remove = []
-        for index in selected_rows:
-            name_item = self.initiative_table.item(index.row(), 0)
-            if name_item:
-                combatant_names_to_remove.append(name_item.text())
-
         for index in sorted([index.row() for index in selected_rows], reverse=True):
-            self.initiative_table.removeRow(index)
+            combatant_names_to_remove.append(self.initiative_model.row_at(index)["name"])
+            self.initiative_model.remove_row(index)
 
         for name in combatant_names_to_remove:
             self._remove_ailments_by_target(name)
             self._append_to_combat_log(f"Removed {name} from combat.")
 
-        if self.initiative_table.rowCount() == 0:
+        if self.initiative_model.rowCount() == 0:
             self.current_turn_row = -1
             self.current_round = 1
             self.round_counter_label.setText(f"Round: {self.current_round}")
             self.first_combatant_name_for_round_check = ""
-        elif self.current_turn_row >= self.initiative_table.rowCount():
+        elif self.current_turn_row >= self.initiative_model.rowCount():
             self.current_turn_row = -1
 
         self._highlight_current_turn()
@@ -894,12 +1553,11 @@ class DungeonMasterAssistant(QMainWindow):
         if column != 3:  # Only edit on Ailments column
             return
 
-        name_item = self.initiative_table.item(row, 0)
-        if not name_item:
+        if not 0 <= row < self.initiative_model.rowCount():
             return
 
-        name = name_item.text()
-        current_ailments = self.ailments.get(name, [])
+        name = self.initiative_model.row_at(row)["name"]
+        current_ailments = self.ailments.get(name, {})
         ailments_str = ", ".join(current_ailments)
 
         # Prompt user to edit ailments
@@ -913,9 +1571,9 @@ class DungeonMasterAssistant(QMainWindow):
         if ok:
             # Parse new ailments
             ailments = [a.strip() for a in new_ailments.split(",") if a.strip()]
-            self.ailments[name] = ailments
-            ailment_item = QTableWidgetItem(", ".join(ailments))
-            self.initiative_table.setItem(row, 3, ailment_item)
+            self.ailments[name] = {a: current_ailments.get(a, {"name": a, "duration": 0, "source": "DM"})
+                                   for a in ailments}
+            self.combat_state_dirty = True
             logging.debug(f"Updated ailments for {name}: {ailments}")
 
     def _remove_ailments_by_target(self, name):
@@ -931,26 +1589,20 @@ class DungeonMasterAssistant(QMainWindow):
     def _update_combatant_hp(self, action_type):
         selected_rows = self.initiative_table.selectionModel().selectedRows()
         if not selected_rows:
-            QMessageBox.warning(self, "Selection Error", "No combatant selected to update HP.")
+            self._warn_selection("No combatant selected to update HP.")
             return
 
         row = selected_rows[0].row()
-        name_item = self.initiative_table.item(row, 0)
-        hp_item = self.initiative_table.item(row, 2)
-
-        if not name_item or not hp_item:
-            QMessageBox.critical(self, "Error", "Could not retrieve combatant data.")
-            return
+        combatant = self.initiative_model.row_at(row)
+        combatant_name = combatant["name"]
 
         try:
-            current_hp = int(hp_item.text())
+            current_hp = int(combatant["hp"])
         except ValueError:
             QMessageBox.critical(self, "Data Error",
-                                 f"HP value '{hp_item.text()}' for {name_item.text()} is not a valid number. Please correct it.")
+                                 f"HP value '{combatant['hp']}' for {combatant_name} is not a valid number. Please correct it.")
             return
 
-        combatant_name = name_item.text()
-
         min_val = 1
         max_val = 99999
 
@@ -966,7 +1618,7 @@ class DungeonMasterAssistant(QMainWindow):
             if action_type == "damage":
                 new_hp = max(0, new_hp)
 
-            hp_item.setText(str(new_hp))
+            self.initiative_model.set_value(row, "hp", new_hp)
             self._append_to_combat_log(
                 f"{combatant_name} {'took' if action_type == 'damage' else 'healed'} {amount} HP. Current HP: {new_hp}.")
             if new_hp <= 0 and action_type == "damage":
@@ -974,13 +1626,11 @@ class DungeonMasterAssistant(QMainWindow):
                 self._append_to_combat_log(f"{combatant_name} is at 0 HP or less!")
 
     def _sort_initiative(self):
-        self.initiative_table.sortItems(1, Qt.SortOrder.DescendingOrder)
+        self.initiative_table.sortByColumn(1, Qt.SortOrder.DescendingOrder)
         self._append_to_combat_log("Initiative order sorted.")
 
-        if self.initiative_table.rowCount() > 0:
-            first_combatant_item = self.initiative_table.item(0, 0)
-            if first_combatant_item:
-                self.first_combatant_name_for_round_check = first_combatant_item.text()
+        if self.initiative_model.rowCount() > 0:
+            self.first_combatant_name_for_round_check = self.initiative_model.row_at(0)["name"]
         else:
             self.first_combatant_name_for_round_check = ""
 
@@ -992,12 +1642,12 @@ class DungeonMasterAssistant(QMainWindow):
 
         TODO: Implement ailment duration tracking if needed.
         """
-        if self.initiative_table.rowCount() == 0:
+        if self.initiative_model.rowCount() == 0:
             return
 
         self.current_turn_row = (
             self.current_turn_row + 1
-        ) % self.initiative_table.rowCount()
+        ) % self.initiative_model.rowCount()
         if self.current_turn_row == 0:
             self.current_round += 1
             self.round_counter_label.setText(f"Round: {self.current_round}")
@@ -1006,44 +1656,47 @@ class DungeonMasterAssistant(QMainWindow):
             f"Advanced to turn {self.current_turn_row}, round {self.current_round}"
         )
 
+    @staticmethod
+    def _combatant_background(combatant):
+        """Tints combatants that are at 0 HP or less."""
+        try:
+            return CombatTableModel.DOWN_BRUSH if int(combatant["hp"]) <= 0 else None
+        except (TypeError, ValueError):
+            return None
+
     def _highlight_current_turn(self):
         """Highlight the current combatant's turn in the initiative table."""
-        for row in range(self.initiative_table.rowCount()):
-            for col in range(self.initiative_table.columnCount()):
-                item = self.initiative_table.item(row, col)
-                if item:
-                    color = (
-                        Qt.GlobalColor.white
-                        if row != self.current_turn_row
-                        else Qt.GlobalColor.lightGray
-                    )
-                    item.setBackground(color)
+        self.initiative_model.set_highlight_row(self.current_turn_row)
 
     def _generate_encounter(self):
         """Generate an encounter and add monsters to the combat tracker."""
         self._place_entities()  # Use map-based entity placement
         logging.debug("Generated encounter via _place_entities")
 
-    def _append_to_combat_log(self, message):
-        """Append a message to the combat log."""
-        timestamp = datetime.now().strftime("[%H:%M:%S]")
-        self.combat_log.append(f"{timestamp} {message}")
-        self.combat_log.verticalScrollBar().setValue(self.combat_log.verticalScrollBar().maximum())
-        logging.debug(message)
-
     def _clear_highlight(self):
         pass
 
     def _append_to_combat_log(self, message):
-        timestamp = datetime.now().strftime("[%H:%M:%S]")
-        self.combat_log.append(f"{timestamp} {message}")
-        self.combat_log.verticalScrollBar().setValue(self.combat_log.verticalScrollBar().maximum())
+        t = time.localtime()
+        self.pending_combat_log.append(f"[{t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}] {message}")
+        if not self.combat_log_timer.isActive():
+            self.combat_log_timer.start()
+        self.combat_state_dirty = True  # The log is part of the saved combat state
+
+    def _flush_combat_log(self):
+        """Appends all queued log lines at once and scrolls to the end."""
+        self.combat_log_timer.stop()
+        if not self.pending_combat_log:
+            return
+        self.combat_log.appendPlainText("\n".join(self.pending_combat_log))
+        self.pending_combat_log.clear()
+        self.combat_log.moveCursor(QTextCursor.MoveOperation.End)
 
     def _add_ailment(self):
         """Add an ailment to the ailment table."""
         target = self.ailment_target_input.text().strip()
         ailment_name = self.ailment_name_input.text().strip()
-        duration_text = self.ailment_duration_input.text().strip()
+        duration = self.ailment_duration_input.value()
         source = "DM"
 
         if not target:
@@ -1052,60 +1705,43 @@ class DungeonMasterAssistant(QMainWindow):
         if not ailment_name:
             QMessageBox.warning(self, "Input Error", "Ailment name cannot be empty.")
             return
-        if not duration_text.isdigit() or int(duration_text) <= 0:
-            QMessageBox.warning(self, "Input Error", "Duration must be a positive number of turns.")
-            return
-
-        duration = int(duration_text)
 
-        row_position = self.ailment_table.rowCount()
-        self.ailment_table.insertRow(row_position)
-        self.ailment_table.setItem(row_position, 0, QTableWidgetItem(target))
-        self.ailment_table.setItem(row_position, 1, QTableWidgetItem(ailment_name))
-        duration_item = QTableWidgetItem()
-        duration_item.setData(Qt.ItemDataRole.DisplayRole, duration)
-        self.ailment_table.setItem(row_position, 2, duration_item)
-        self.ailment_table.setItem(row_position, 3, QTableWidgetItem(source))
+        self.ailment_model.append_row(
+            {"target": target, "ailment": ailment_name, "duration": duration, "source": source})
 
-        self.ailments[target].append({"name": ailment_name, "duration": duration, "source": source})
+        self.ailments.setdefault(target, {})[ailment_name] = {"name": ailment_name, "duration": duration,
+                                                              "source": source}
         self._append_to_combat_log(
             f"Added ailment '{ailment_name}' to {target} for {duration} turns (Source: {source}).")
 
         self.ailment_target_input.clear()
         self.ailment_name_input.clear()
-        self.ailment_duration_input.clear()
+        self.ailment_duration_input.setValue(self.ailment_duration_input.minimum())
     def _remove_selected_ailment(self):
         """Remove selected ailments from the ailment table."""
         selected_rows = self.ailment_table.selectionModel().selectedRows()
         if not selected_rows:
-            QMessageBox.warning(self, "Selection Error", "No ailment selected to remove.")
+            self._warn_selection("No ailment selected to remove.")
             return
 
         for index in sorted([index.row() for index in selected_rows], reverse=True):
-            target_item = self.ailment_table.item(index.row(), 0)
-            ailment_item = self.ailment_table.item(index.row(), 1)
-            if target_item and ailment_item:
-                target_name = target_item.text()
-                ailment_name = ailment_item.text()
-                self.ailments[target_name] = [a for a in self.ailments[target_name] if a["name"] != ailment_name]
-                self._append_to_combat_log(f"Manually removed ailment '{ailment_name}' from {target_name}.")
-            self.ailment_table.removeRow(index)
+            ailment = self.ailment_model.row_at(index)
+            target_name = ailment["target"]
+            ailment_name = ailment["ailment"]
+            self.ailments.get(target_name, {}).pop(ailment_name, None)
+            self._append_to_combat_log(f"Manually removed ailment '{ailment_name}' from {target_name}.")
+            self.ailment_model.remove_row(index)
 
 
     def _remove_ailments_by_target(self, target_name):
         """Remove all ailments associated with a specific target combatant."""
-        rows_to_remove = []
-        for r in range(self.ailment_table.rowCount()):
-            target_item = self.ailment_table.item(r, 0)
-            if target_item and target_item.text() == target_name:
-                rows_to_remove.append(r)
+        rows_to_remove = [r for r, ailment in enumerate(self.ailment_model.rows())
+                          if ailment["target"] == target_name]
 
         for row_index in sorted(rows_to_remove, reverse=True):
-            ailment_item = self.ailment_table.item(row_index, 1)
-            if ailment_item:
-                self._append_to_combat_log(
-                    f"Removed ailment '{ailment_item.text()}' from {target_name} due to combatant removal.")
-            self.ailment_table.removeRow(row_index)
+            self._append_to_combat_log(
+                f"Removed ailment '{self.ailment_model.row_at(row_index)['ailment']}' from {target_name} due to combatant removal.")
+            self.ailment_model.remove_row(row_index)
 
         if target_name in self.ailments:
             del self.ailments[target_name]
@@ -1113,63 +1749,48 @@ class DungeonMasterAssistant(QMainWindow):
     def _decrement_ailment_duration(self, current_combatant_name):
         """Decrement ailment durations for a combatant and remove expired ailments."""
         rows_to_remove = []
-        for r in range(self.ailment_table.rowCount()):
-            target_item = self.ailment_table.item(r, 0)
-            duration_item = self.ailment_table.item(r, 2)
-            ailment_name_item = self.ailment_table.item(r, 1)
+        remaining = {}
+        for r, ailment in enumerate(self.ailment_model.rows()):
+            if ailment["target"] != current_combatant_name:
+                continue
+            ailment_name = ailment["ailment"]
+            try:
+                ailment["duration"] = int(ailment["duration"]) - 1
+            except ValueError:
+                self._append_to_combat_log(
+                    f"Error: Invalid duration for ailment '{ailment_name}' on {current_combatant_name}. Marking for removal.")
+                rows_to_remove.append(r)
+                continue
 
-            if target_item and duration_item and ailment_name_item and target_item.text() == current_combatant_name:
-                try:
-                    current_duration = duration_item.data(Qt.ItemDataRole.DisplayRole)
-                    if current_duration is None:
-                        current_duration = int(duration_item.text())
-
-                    if current_duration > 0:
-                        new_duration = current_duration - 1
-                        duration_item.setData(Qt.ItemDataRole.DisplayRole, new_duration)
-                        duration_item.setText(str(new_duration))
-                        self.ailments[current_combatant_name] = [
-                            a for a in self.ailments[current_combatant_name]
-                            if a["name"] != ailment_name_item.text() or a["duration"] != current_duration
-                        ]
-                        if new_duration > 0:
-                            self.ailments[current_combatant_name].append({
-                                "name": ailment_name_item.text(),
-                                "duration": new_duration,
-                                "source": self.ailment_table.item(r, 3).text()
-                            })
-                            self._append_to_combat_log(
-                                f"'{ailment_name_item.text()}' on {current_combatant_name} now has {new_duration} turns remaining.")
-                        if new_duration == 0:
-                            rows_to_remove.append(r)
-                            self._append_to_combat_log(
-                                f"'{ailment_name_item.text()}' on {current_combatant_name} has ended.")
-                    else:
-                        rows_to_remove.append(r)
-                except ValueError:
-                    self._append_to_combat_log(
-                        f"Error: Invalid duration for ailment '{ailment_name_item.text()}' on {current_combatant_name}. Marking for removal.")
-                    rows_to_remove.append(r)
+            if ailment["duration"] > 0:
+                remaining[ailment_name] = {"name": ailment_name, "duration": ailment["duration"],
+                                           "source": ailment["source"]}
+                self._append_to_combat_log(
+                    f"'{ailment_name}' on {current_combatant_name} now has {ailment['duration']} turns remaining.")
+            else:
+                rows_to_remove.append(r)
+                self._append_to_combat_log(f"'{ailment_name}' on {current_combatant_name} has ended.")
 
-        for row_index in sorted(rows_to_remove, reverse=True):
-            self.ailment_table.removeRow(row_index)
+        if current_combatant_name in self.ailments:
+            self.ailments[current_combatant_name] = remaining
+        self.ailment_model.column_changed("duration")
+        for row_index in reversed(rows_to_remove):
+            self.ailment_model.remove_row(row_index)
 
     def _next_turn(self):
         """Advance to the next turn in combat."""
-        if self.initiative_table.rowCount() == 0:
+        if self.initiative_model.rowCount() == 0:
             return
 
-        self.current_turn_row = (self.current_turn_row + 1) % self.initiative_table.rowCount()
+        self.current_turn_row = (self.current_turn_row + 1) % self.initiative_model.rowCount()
         if self.current_turn_row == 0:
             self.current_round += 1
             self.round_counter_label.setText(f"Round: {self.current_round}")
             self._append_to_combat_log(f"Round {self.current_round} begins.")
 
-        name_item = self.initiative_table.item(self.current_turn_row, 0)
-        if name_item:
-            current_combatant = name_item.text()
-            self._decrement_ailment_duration(current_combatant)
-            self._append_to_combat_log(f"{current_combatant}'s turn.")
+        current_combatant = self.initiative_model.row_at(self.current_turn_row)["name"]
+        self._decrement_ailment_duration(current_combatant)
+        self._append_to_combat_log(f"{current_combatant}'s turn.")
         self._highlight_current_turn()
 
 
@@ -1180,40 +1801,52 @@ class DungeonMasterAssistant(QMainWindow):
                 f.write(path)
         except IOError as e:
             print(f"Warning: Could not save last state path to '{self.LAST_STATE_FILE}': {e}")
-            self.statusBar().showMessage(f"Warning: Could not save last state path.")
+            self._show_status(f"Warning: Could not save last state path.")
+
+    def _restore_last_combat_state(self):
+        """Auto-loads the last combat state, if one was recorded."""
+        last_path = self._load_last_state_path()
+        if last_path:
+            self._show_status(
+                f"Attempting to auto-load last combat state from: {os.path.basename(last_path)}")
+            self.current_combat_file_path = last_path
+            self._load_combat_state(file_path=last_path)
+        else:
+            self._show_status("Ready (No previous combat state to auto-load)")
+            self._save_last_state_path(self.current_combat_file_path)
 
     def _load_last_state_path(self):
         """Loads the path of the last combat state file."""
-        if os.path.exists(self.LAST_STATE_FILE):
+        state_file = Path(self.LAST_STATE_FILE)
+        if state_file.exists():
             try:
-                with open(self.LAST_STATE_FILE, 'r', encoding='utf-8') as f:
-                    path = f.read().strip()
-                    if path and os.path.exists(path):
-                        return path
+                path = state_file.read_text(encoding='utf-8').strip()
+                if path and Path(path).exists():
+                    return path
             except IOError as e:
                 print(f"Error reading last state path from '{self.LAST_STATE_FILE}': {e}")
-                self.statusBar().showMessage(f"Error loading last state path.")
+                self._show_status(f"Error loading last state path.")
         return None
 
-    def _save_combat_state(self, file_path=None, is_auto_save=False):
-        combatants_data = []
-        for row in range(self.initiative_table.rowCount()):
-            name = self.initiative_table.item(row, 0).text()
-            initiative = self.initiative_table.item(row, 1).data(Qt.ItemDataRole.DisplayRole)
-            hp = self.initiative_table.item(row, 2).text()
-            combatants_data.append({"name": name, "initiative": initiative, "hp": hp})
-
-        ailments_data = []
-        for row in range(self.ailment_table.rowCount()):
-            target = self.ailment_table.item(row, 0).text()
-            ailment = self.ailment_table.item(row, 1).text()
-            duration = self.ailment_table.item(row, 2).data(Qt.ItemDataRole.DisplayRole)
-            source = self.ailment_table.item(row, 3).text()
-            ailments_data.append({"target": target, "ailment": ailment, "duration": duration, "source": source})
+    @staticmethod
+    def _encode_combat_state(combat_state):
+        """Serializes a combat state dict to bytes, using orjson when available."""
+        if orjson is not None:
+            return orjson.dumps(combat_state, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_INDENT_2)
+        return json.dumps(combat_state, indent=2).encode('utf-8')
+
+    @staticmethod
+    def _decode_combat_state(data):
+        """Parses combat state bytes, using orjson when available."""
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
 
+    def _save_combat_state(self, file_path=None, is_auto_save=False):
+        self._flush_combat_log()  # Queued lines are part of the saved log
         combat_state = {
-            "combatants": combatants_data,
-            "ailments": ailments_data,
+            "combatants": self.initiative_model.rows(),
+            "ailments": self.ailment_model.rows(),
             "current_turn_row": self.current_turn_row,
             "current_round": self.current_round,
             "combat_log": self.combat_log.toPlainText(),
@@ -1224,28 +1857,33 @@ class DungeonMasterAssistant(QMainWindow):
             file_path, _ = QFileDialog.getSaveFileName(self, "Save Combat State", "",
                                                        "Combat State Files (*.json);;All Files (*)")
             if not file_path:
-                self.statusBar().showMessage("Combat state save cancelled.")
+                self._show_status("Combat state save cancelled.")
                 return
 
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(combat_state, f, indent=4)
+            Path(file_path).write_bytes(self._encode_combat_state(combat_state))
 
             if is_auto_save:
-                self.statusBar().showMessage(f"Auto-saved combat state to '{os.path.basename(file_path)}'")
+                self._show_status(f"Auto-saved combat state to '{os.path.basename(file_path)}'")
             else:
-                self.statusBar().showMessage(f"Combat state saved to '{os.path.basename(file_path)}'")
+                self._show_status(f"Combat state saved to '{os.path.basename(file_path)}'")
                 self._append_to_combat_log(f"Combat state saved to '{os.path.basename(file_path)}'")
                 self.current_combat_file_path = file_path
                 self._save_last_state_path(file_path)
+            self.combat_state_dirty = False
 
         except Exception as e:
             msg = "Auto-save failed." if is_auto_save else "Failed to save combat state."
             QMessageBox.critical(self, "Save Error", f"{msg}:\n{e}")
-            self.statusBar().showMessage(msg)
+            self._show_status(msg)
+
+    def _mark_combat_state_dirty(self, *_):
+        self.combat_state_dirty = True
 
     def _auto_save_combat_state(self):
         """Automatically saves the combat state to the current combat file path."""
+        if not self.combat_state_dirty:
+            return
         if self.current_combat_file_path:
             self._save_combat_state(file_path=self.current_combat_file_path, is_auto_save=True)
         else:
@@ -1259,560 +1897,181 @@ class DungeonMasterAssistant(QMainWindow):
             file_path, _ = QFileDialog.getOpenFileName(self, "Load Combat State", "",
                                                        "Combat State Files (*.json);;All Files (*)")
             if not file_path:
-                self.statusBar().showMessage("Combat state load cancelled.")
+                self._show_status("Combat state load cancelled.")
                 return
 
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                combat_state = json.load(f)
-
-            self._clear_highlight()
-            self.initiative_table.setRowCount(0)
-            self.ailment_table.setRowCount(0)
-            self.combat_log.clear()
-
-            combatants_data = combat_state.get("combatants", [])
-            self.initiative_table.setRowCount(len(combatants_data))
-            for row_num, combatant in enumerate(combatants_data):
-                name_item = QTableWidgetItem(combatant.get("name", ""))
-                init_item = QTableWidgetItem()
-                init_item.setData(Qt.ItemDataRole.DisplayRole, int(combatant.get("initiative", 0)))
-                hp_item = QTableWidgetItem(str(combatant.get("hp", "")))
-                self.initiative_table.setItem(row_num, 0, name_item)
-                self.initiative_table.setItem(row_num, 1, init_item)
-                self.initiative_table.setItem(row_num, 2, hp_item)
-
-            ailments_data = combat_state.get("ailments", [])
-            self.ailment_table.setRowCount(len(ailments_data))
-            for row_num, ailment in enumerate(ailments_data):
-                target_item = QTableWidgetItem(ailment.get("target", ""))
-                ailment_name_item = QTableWidgetItem(ailment.get("ailment", ""))
-                duration_item = QTableWidgetItem()
-                duration_item.setData(Qt.ItemDataRole.DisplayRole, int(ailment.get("duration", 0)))
-                source_item = QTableWidgetItem(ailment.get("source", ""))
-                self.ailment_table.setItem(row_num, 0, target_item)
-                self.ailment_table.setItem(row_num, 1, ailment_name_item)
-                self.ailment_table.setItem(row_num, 2, duration_item)
-                self.ailment_table.setItem(row_num, 3, source_item)
-
-            self.current_turn_row = combat_state.get("current_turn_row", -1)
-            self.current_round = combat_state.get("current_round", 1)
-            self.combat_log.setPlainText(combat_state.get("combat_log", "Combat log loaded."))
-            self.first_combatant_name_for_round_check = combat_state.get("first_combatant_name_for_round_check", "")
-
-            self.round_counter_label.setText(f"Round: {self.current_round}")
-            self._highlight_current_turn()
-            self.combat_log.verticalScrollBar().setValue(self.combat_log.verticalScrollBar().maximum())
-
-            self.statusBar().showMessage(f"Combat state loaded from '{os.path.basename(file_path)}'")
-            self._append_to_combat_log(f"Combat state loaded from '{os.path.basename(file_path)}'")
-            self.current_combat_file_path = file_path
-            self._save_last_state_path(file_path)
-
-        except Exception as e:
-            QMessageBox.critical(self, "Load Error",
-                                 f"Failed to load combat state from '{os.path.basename(file_path)}':\n{e}")
-            self.statusBar().showMessage("Failed to load combat state.")
-
-    def create_map_generator_tab(self):
-        logging.debug("Creating map generator tab")
-        map_tab = QWidget(self)
-        layout = QHBoxLayout(map_tab)
-
-        # Controls
-        controls_widget = QWidget(self)
-        controls_layout = QVBoxLayout(controls_widget)
-        controls_layout.addWidget(QLabel("<h2>Map Generation</h2>", self))
-
-        # Map Settings
-        settings_group = QGroupBox("Map Settings")
-        settings_layout = QVBoxLayout()
-        size_layout = QHBoxLayout()
-        self.map_width_input = QLineEdit(self)
-        self.map_width_input.setPlaceholderText("Width (5-30)")
-        self.map_width_input.setText("20")
-        self.map_height_input = QLineEdit(self)
-        self.map_height_input.setPlaceholderText("Height (5-30)")
-        self.map_height_input.setText("10")
-        size_layout.addWidget(QLabel("Grid Size:", self))
-        size_layout.addWidget(self.map_width_input)
-        size_layout.addWidget(self.map_height_input)
-        settings_layout.addLayout(size_layout)
-
-        theme_layout = QHBoxLayout()
-        self.map_theme_combo = QComboBox(self)
-        self.map_theme_combo.addItems(["Dungeon", "Cave", "Castle", "Forest"])
-        theme_layout.addWidget(QLabel("Theme:", self))
-        theme_layout.addWidget(self.map_theme_combo)
-        settings_layout.addLayout(theme_layout)
-
-        settings_group.setLayout(settings_layout)
-        controls_layout.addWidget(settings_group)
-
-        # Generation Controls
-        generate_button = QPushButton("Generate Map", self)
-        generate_button.clicked.connect(self._on_generate_map_clicked)
-        controls_layout.addWidget(generate_button)
-
-        save_button = QPushButton("Save Map as Image", self)
-        save_button.clicked.connect(self._save_map_as_image)
-        controls_layout.addWidget(save_button)
-
-        # Entity Placement
-        entity_group = QGroupBox("Place Entities")
-        entity_layout = QVBoxLayout()
-
-        # Entity Checkboxes and Quantities
-        entity_types = ["Monsters", "Magic Items", "Armor", "Weapons"]
-        self.entity_checkboxes = {}
-        self.entity_quantity_inputs = {}
-        for entity_type in entity_types:
-            checkbox_layout = QHBoxLayout()
-            checkbox = QCheckBox(entity_type, self)
-            quantity_input = QLineEdit(self)
-            quantity_input.setPlaceholderText(f"{entity_type} (0-5)")
-            quantity_input.setText("0")
-            quantity_input.setEnabled(False)
-            checkbox.stateChanged.connect(
-                lambda state, inp=quantity_input: inp.setEnabled(state == Qt.CheckState.Checked.value))
-            checkbox_layout.addWidget(checkbox)
-            checkbox_layout.addWidget(quantity_input)
-            entity_layout.addLayout(checkbox_layout)
-            self.entity_checkboxes[entity_type] = checkbox
-            self.entity_quantity_inputs[entity_type] = quantity_input
-
-        # Party Level
-        level_layout = QHBoxLayout()
-        self.party_level_input = QLineEdit(self)
-        self.party_level_input.setPlaceholderText("Party Level (1-20)")
-        self.party_level_input.setText("5")
-        level_layout.addWidget(QLabel("Party Level:", self))
-        level_layout.addWidget(self.party_level_input)
-        entity_layout.addLayout(level_layout)
-
-        # Place Button
-        place_button = QPushButton("Place Entities", self)
-        place_button.clicked.connect(self._place_entities)
-        entity_layout.addWidget(place_button)
-
-        entity_group.setLayout(entity_layout)
-        controls_layout.addWidget(entity_group)
-
-        # Map Description
-        desc_group = QGroupBox("Map Description")
-        desc_layout = QVBoxLayout()
-        self.map_description = QTextEdit(self)
-        self.map_description.setReadOnly(True)
-        self.map_description.setPlaceholderText("Map details will appear here...")
-        desc_layout.addWidget(self.map_description)
-        desc_group.setLayout(desc_layout)
-        controls_layout.addWidget(desc_group)
-
-        controls_layout.addStretch()
-
-        # Map Display
-        self.map_label = QLabel(self)
-        self.map_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.map_label.setMinimumSize(300, 200)
-        self.map_pixmap = None
-        self.map_with_entities_pixmap = None
-
-        splitter = QSplitter(Qt.Orientation.Horizontal)
-        splitter.addWidget(controls_widget)
-        splitter.addWidget(self.map_label)
-        splitter.setSizes([300, 900])
-
-        layout.addWidget(splitter)
-        self.central_widget.addTab(map_tab, "Map Generator")
-
-        # Initialize map
-        self._on_generate_map_clicked()
-        logging.debug("Map generator tab created")
-
-    def _place_entities(self):
-        logging.debug("Starting _place_entities")
-        if not self.current_map_rooms:
-            QMessageBox.warning(self, "Placement Error", "No rooms available. Generate a map first.")
-            self._append_to_combat_log("Error: No rooms available for entity placement.")
-            logging.debug("No rooms available")
-            return
-
-        # Validate party level
-        try:
-            party_level = int(self.party_level_input.text())
-            if not 1 <= party_level <= 20:
-                raise ValueError("Party level must be between 1 and 20.")
-        except ValueError as e:
-            QMessageBox.warning(self, "Input Error", f"Invalid party level: {str(e)}")
-            self._append_to_combat_log(f"Error: Invalid party level: {str(e)}")
-            logging.debug(f"Invalid party level: {str(e)}")
-            return
-
-        # Collect selected entity types and quantities
-        entity_requests = {}
-        total_quantity = 0
-        for entity_type in self.entity_checkboxes:
-            if self.entity_checkboxes[entity_type].isChecked():
-                try:
-                    qty = int(self.entity_quantity_inputs[entity_type].text())
-                    if not 0 <= qty <= 5:  # Lower max per type
-                        raise ValueError(f"Quantity for {entity_type} must be between 0 and 5.")
-                    if qty > 0:
-                        entity_requests[entity_type] = qty
-                        total_quantity += qty
-                except ValueError as e:
-                    QMessageBox.warning(self, "Input Error", str(e))
-                    self._append_to_combat_log(f"Error: {str(e)}")
-                    logging.debug(f"Invalid quantity for {entity_type}: {str(e)}")
-                    return
-
-        if not entity_requests:
-            QMessageBox.warning(self, "Selection Error",
-                                "Please select at least one entity type with a quantity greater than 0.")
-            self._append_to_combat_log("Error: No entity types selected for placement.")
-            logging.debug("No entity types selected")
-            return
-
-        logging.debug(f"Entity requests: {entity_requests}, total: {total_quantity}")
-
-        # Cap total entities to available rooms
-        max_entities = min(total_quantity, len(self.current_map_rooms), 20)  # Hard cap at 20
-        if max_entities < total_quantity:
-            self._append_to_combat_log(
-                f"Warning: Limited to {max_entities} entities due to {len(self.current_map_rooms)} rooms available.")
-            logging.debug(f"Limited to {max_entities} entities")
-            total_quantity = max_entities
-
-        # Fetch entities
-        available_entities = {}
-        db_session = SessionLocal()
-        try:
-            for entity_type, qty in entity_requests.items():
-                logging.debug(f"Querying {entity_type}")
-                if entity_type == "Monsters":
-                    cr_max = max(1, party_level // 2)
-                    query = db_session.query(Monster).filter(Monster.cr.in_([str(i) for i in range(1, cr_max + 1)]))
-                    entities = query.limit(50).all()  # Lower limit
-                elif entity_type == "Magic Items":
-                    rarities = ["Common", "Uncommon", "Rare"] if party_level < 10 else ["Common", "Uncommon", "Rare",
-                                                                                        "Very Rare"]
-                    query = db_session.query(MagicItem).filter(MagicItem.rarity.in_(rarities))
-                    entities = query.limit(50).all()
-                elif entity_type == "Armor":
-                    query = db_session.query(Armor)
-                    entities = query.limit(50).all()
-                elif entity_type == "Weapons":
-                    query = db_session.query(Weapon)
-                    entities = query.limit(50).all()
-
-                if not entities:
-                    QMessageBox.warning(self, "Placement Error", f"No {entity_type} found in database.")
-                    self._append_to_combat_log(f"Error: No {entity_type} found in database.")
-                    logging.debug(f"No {entity_type} found")
-                    return
-                available_entities[entity_type] = entities
-                self._append_to_combat_log(f"Found {len(entities)} {entity_type} for placement.")
-                logging.debug(f"Found {len(entities)} {entity_type}")
-        except Exception as e:
-            self._append_to_combat_log(f"Database error: {str(e)}")
-            logging.error(f"Database error: {str(e)}")
-            return
-        finally:
-            db_session.close()
-            logging.debug("Database session closed")
-
-        # Clear existing entities
-        self.active_map_entities.clear()
-        logging.debug("Cleared active_map_entities")
-
-        # Initialize pixmap
-        try:
-            self.map_with_entities_pixmap = self.map_pixmap.copy() if self.map_pixmap else None
-            if self.map_with_entities_pixmap is None or self.map_with_entities_pixmap.isNull():
-                raise ValueError("Invalid map pixmap")
-        except Exception as e:
-            QMessageBox.critical(self, "Pixmap Error", f"Failed to copy map pixmap: {str(e)}")
-            self._append_to_combat_log(f"Error copying pixmap: {str(e)}")
-            logging.error(f"Pixmap error: {str(e)}")
-            return
-
-        # Initialize painter
-        painter = None
-        try:
-            painter = QPainter(self.map_with_entities_pixmap)
-            tile_size = 10  # Smaller tiles
-            font = QFont("Arial", 6)  # Smaller font
-            painter.setFont(font)
-        except Exception as e:
-            QMessageBox.critical(self, "Painter Error", f"Failed to initialize QPainter: {str(e)}")
-            self._append_to_combat_log(f"Error initializing QPainter: {str(e)}")
-            logging.error(f"Painter error: {str(e)}")
-            return
-
-        # Color coding
-        colors = {
-            "Monsters": QColor("#FF0000"),
-            "Magic Items": QColor("#00FF00"),
-            "Armor": QColor("#0000FF"),
-            "Weapons": QColor("#FFFF00")
-        }
-
-        # Prepare placement list
-        placement_list = []
-        for entity_type, qty in entity_requests.items():
-            placement_list.extend([(entity_type, qty) for _ in range(qty)])
-        random.shuffle(placement_list)
-        logging.debug(f"Placement list: {len(placement_list)} items")
-
-        # Place entities
-        placed = []
-        used_rooms = set()
-        try:
-            for i, (entity_type, _) in enumerate(placement_list[:max_entities]):
-                logging.debug(f"Placing {entity_type} #{i + 1}")
-                entities = available_entities[entity_type]
-                entity = random.choice(entities)
-                available_rooms = [r for j, r in enumerate(self.current_map_rooms) if j not in used_rooms]
-                if not available_rooms:
-                    available_rooms = self.current_map_rooms
-                room = random.choice(available_rooms)
-                room_idx = self.current_map_rooms.index(room)
-                used_rooms.add(room_idx)
-                rx, ry, rw, rh = room
-
-                # Validate placement
-                if rw <= 2 or rh <= 2:
-                    self._append_to_combat_log(f"Skipping invalid room {room_idx + 1} with size {rw}x{rh}")
-                    logging.debug(f"Invalid room {room_idx + 1}: {rw}x{rh}")
-                    continue
-
-                px = random.randint(rx + 1, rx + rw - 2)
-                py = random.randint(ry + 1, ry + rh - 2)
-                logging.debug(f"Position for {entity_type}: ({px}, {py})")
-
-                # Draw entity
-                painter.setBrush(QBrush(colors[entity_type]))
-                painter.setPen(QPen(Qt.PenStyle.NoPen))
-                painter.drawEllipse(px * tile_size, py * tile_size, tile_size, tile_size)
-                painter.setPen(QPen(QColor("#FFFFFF")))
-                name = getattr(entity, "name", "X")[:1]
-                painter.drawText(px * tile_size, py * tile_size, tile_size, tile_size,
-                                 Qt.AlignmentFlag.AlignCenter, name)
-                logging.debug(f"Drew {entity_type} '{name}' at ({px}, {py})")
-
-                # Store entity
-                self.active_map_entities.append({
-                    "type": entity_type,
-                    "data": entity,
-                    "map_x": px,
-                    "map_y": py,
-                    "room": room
-                })
-                placed.append((entity_type, entity, px, py, room))
-
-                # Add monsters to combat tracker
-                if entity_type == "Monsters":
-                    try:
-                        name = getattr(entity, "name", "Unknown Monster")
-                        hp = getattr(entity, "hp", 10)
-                        if not isinstance(hp, (int, float)):
-                            hp = 10
-                        self.add_combatant(name=name, hp=hp)
-                        self._append_to_combat_log(f"Added {name} (HP: {hp}) to combat tracker.")
-                        logging.debug(f"Added {name} (HP: {hp}) to combat tracker")
-                    except Exception as e:
-                        self._append_to_combat_log(f"Error adding {name} to combat tracker: {str(e)}")
-                        logging.error(f"Combat tracker error for {name}: {str(e)}")
-
-                QApplication.processEvents()  # Keep UI responsive
-        except Exception as e:
-            self._append_to_combat_log(f"Placement error: {str(e)}")
-            logging.error(f"Placement error: {str(e)}")
-        finally:
-            if painter:
-                painter.end()
-            logging.debug("Painter ended")
-
-        # Update description
-        try:
-            desc = self.map_description.toPlainText().split("\nPlaced Entities:")[0]
-            desc += "\nPlaced Entities:\n"
-            for i, (entity_type, entity, _, x, y, room) in enumerate(placed, 1):
-                name = getattr(entity, "name", "Unknown")
-                desc += f"{i}. {entity_type}: {name} at ({x},{y}) in Room {self.current_map_rooms.index(room) + 1}\n"
-            self.map_description.setPlainText(desc)
+            combat_state = self._decode_combat_state(Path(file_path).read_bytes())
+
+            self._clear_highlight()
+            self.pending_combat_log.clear()
+
+            self.initiative_model.set_rows([
+                {"name": combatant.get("name", ""),
+                 "initiative": int(combatant.get("initiative", 0)),
+                 "hp": combatant.get("hp", "")}
+                for combatant in combat_state.get("combatants", [])
+            ])
+            self.ailment_model.set_rows([
+                {"target": ailment.get("target", ""),
+                 "ailment": ailment.get("ailment", ""),
+                 "duration": int(ailment.get("duration", 0)),
+                 "source": ailment.get("source", "")}
+                for ailment in combat_state.get("ailments", [])
+            ])
+
+            self.current_turn_row = combat_state.get("current_turn_row", -1)
+            self.current_round = combat_state.get("current_round", 1)
+            # Lay the saved log out in a detached document, then swap it in
+            log_document = QTextDocument(self.combat_log)
+            log_document.setDocumentLayout(QPlainTextDocumentLayout(log_document))
+            log_document.setDefaultFont(self.combat_log.font())
+            log_document.setPlainText(combat_state.get("combat_log", "Combat log loaded."))
+            old_document = self.combat_log.document()
+            self.combat_log.setDocument(log_document)
+            # The editor only deletes its own original document; ones swapped in here are children of combat_log
+            if old_document.parent() is self.combat_log:
+                old_document.deleteLater()
+            self.first_combatant_name_for_round_check = combat_state.get("first_combatant_name_for_round_check", "")
+
+            self.round_counter_label.setText(f"Round: {self.current_round}")
+            self._highlight_current_turn()
+            self.combat_log.moveCursor(QTextCursor.MoveOperation.End)
+
+            self._show_status(f"Combat state loaded from '{os.path.basename(file_path)}'")
+            self._append_to_combat_log(f"Combat state loaded from '{os.path.basename(file_path)}'")
+            self.current_combat_file_path = file_path
+            self._save_last_state_path(file_path)
+            self.combat_state_dirty = False  # Matches the file just read
+
         except Exception as e:
-            self._append_to_combat_log(f"Description update error: {str(e)}")
-            logging.error(f"Description error: {str(e)}")
+            QMessageBox.critical(self, "Load Error",
+                                 f"Failed to load combat state from '{os.path.basename(file_path)}':\n{e}")
+            self._show_status("Failed to load combat state.")
 
-        self._update_map_display()
-        self._append_to_combat_log(f"Placed {len(placed)} entities")
-        self.statusBar().showMessage(f"Placed {len(placed)} entities on the map.")
-        logging.debug(f"Completed placement: {len(placed)} entities")
+    def create_map_generator_tab(self):
+        logging.debug("Creating map generator tab")
+        map_tab = QWidget(self)
+        layout = QHBoxLayout(map_tab)
 
-    def _place_entities(self):
-        if not self.current_map_rooms:
-            QMessageBox.warning(self, "Placement Error", "No rooms available. Generate a map first.")
-            self._append_to_combat_log("Error: No rooms available for entity placement.")
-            return
+        # Controls
+        controls_widget = QWidget(self)
+        controls_layout = QVBoxLayout(controls_widget)
+        controls_layout.addWidget(QLabel("<h2>Map Generation</h2>", self))
 
-        # Validate party level
-        try:
-            party_level = int(self.party_level_input.text())
-            if not 1 <= party_level <= 20:
-                raise ValueError("Party level must be between 1 and 20.")
-        except ValueError as e:
-            QMessageBox.warning(self, "Input Error", f"Invalid party level: {str(e)}")
-            self._append_to_combat_log(f"Error: Invalid party level: {str(e)}")
-            return
+        # Map Settings
+        settings_group = QGroupBox("Map Settings")
+        settings_layout = QVBoxLayout()
+        size_layout = QHBoxLayout()
+        self.map_width_input = QLineEdit(self)
+        self.map_width_input.setPlaceholderText("Width (5-30)")
+        self.map_width_input.setText("20")
+        self.map_height_input = QLineEdit(self)
+        self.map_height_input.setPlaceholderText("Height (5-30)")
+        self.map_height_input.setText("10")
+        size_layout.addWidget(QLabel("Grid Size:", self))
+        size_layout.addWidget(self.map_width_input)
+        size_layout.addWidget(self.map_height_input)
+        settings_layout.addLayout(size_layout)
 
-        # Collect selected entity types and quantities
-        entity_requests = {}
-        total_quantity = 0
-        for entity_type in self.entity_checkboxes:
-            if self.entity_checkboxes[entity_type].isChecked():
-                try:
-                    qty = int(self.entity_quantity_inputs[entity_type].text())
-                    if not 0 <= qty <= 10:
-                        raise ValueError(f"Quantity for {entity_type} must be between 0 and 10.")
-                    if qty > 0:
-                        entity_requests[entity_type] = qty
-                        total_quantity += qty
-                except ValueError as e:
-                    QMessageBox.warning(self, "Input Error", str(e))
-                    self._append_to_combat_log(f"Error: {str(e)}")
-                    return
+        theme_layout = QHBoxLayout()
+        self.map_theme_combo = QComboBox(self)
+        self.map_theme_combo.addItems(["Dungeon", "Cave", "Castle", "Forest"])
+        theme_layout.addWidget(QLabel("Theme:", self))
+        theme_layout.addWidget(self.map_theme_combo)
+        settings_layout.addLayout(theme_layout)
 
-        if not entity_requests:
-            QMessageBox.warning(self, "Selection Error",
-                                "Please select at least one entity type with a quantity greater than 0.")
-            self._append_to_combat_log("Error: No entity types selected for placement.")
-            return
+        settings_group.setLayout(settings_layout)
+        controls_layout.addWidget(settings_group)
 
-        self._append_to_combat_log(f"Placing entities for party level {party_level}: {entity_requests}")
+        # Generation Controls
+        generate_button = QPushButton("Generate Map", self)
+        generate_button.clicked.connect(self._on_generate_map_clicked)
+        controls_layout.addWidget(generate_button)
 
-        # Cap total entities to available rooms
-        max_entities = min(total_quantity, len(self.current_map_rooms))
-        if max_entities < total_quantity:
-            self._append_to_combat_log(
-                f"Warning: Limited to {max_entities} entities due to {len(self.current_map_rooms)} rooms available.")
-            total_quantity = max_entities
+        save_button = QPushButton("Save Map as Image", self)
+        save_button.clicked.connect(self._save_map_as_image)
+        controls_layout.addWidget(save_button)
 
-        # Fetch entities
-        db_session = SessionLocal()
-        available_entities = {}
-        try:
-            for entity_type, qty in entity_requests.items():
-                if entity_type == "Monsters":
-                    cr_max = max(1, party_level // 2)
-                    query = db_session.query(Monster).filter(Monster.cr.in_([str(i) for i in range(1, cr_max + 1)]))
-                    entities = query.limit(100).all()
-                elif entity_type == "Magic Items":
-                    rarities = ["Common", "Uncommon", "Rare"] if party_level < 10 else ["Common", "Uncommon", "Rare",
-                                                                                        "Very Rare"]
-                    query = db_session.query(MagicItem).filter(MagicItem.rarity.in_(rarities))
-                    entities = query.limit(100).all()
-                elif entity_type == "Armor":
-                    query = db_session.query(Armor)
-                    entities = query.limit(100).all()
-                elif entity_type == "Weapons":
-                    query = db_session.query(Weapon)
-                    entities = query.limit(100).all()
+        # Entity Placement
+        entity_group = QGroupBox("Place Entities")
+        entity_layout = QVBoxLayout()
 
-                if not entities:
-                    QMessageBox.warning(self, "Placement Error", f"No {entity_type} found in database.")
-                    self._append_to_combat_log(f"Error: No {entity_type} found in database.")
-                    return
-                available_entities[entity_type] = entities
-                self._append_to_combat_log(f"Found {len(entities)} {entity_type} for placement.")
-        finally:
-            db_session.close()
+        # Entity Checkboxes and Quantities
+        entity_types = ["Monsters", "Magic Items", "Armor", "Weapons"]
+        self.entity_checkboxes = {}
+        self.entity_quantity_inputs = {}
+        for entity_type in entity_types:
+            checkbox_layout = QHBoxLayout()
+            checkbox = QCheckBox(entity_type, self)
+            quantity_input = QSpinBox(self)
+            quantity_input.setRange(0, 5)
+            quantity_input.setEnabled(False)
+            checkbox.stateChanged.connect(
+                lambda state, inp=quantity_input: inp.setEnabled(state == Qt.CheckState.Checked.value))
+            checkbox_layout.addWidget(checkbox)
+            checkbox_layout.addWidget(quantity_input)
+            entity_layout.addLayout(checkbox_layout)
+            self.entity_checkboxes[entity_type] = checkbox
+            self.entity_quantity_inputs[entity_type] = quantity_input
 
-        # Clear existing entities
-        self.active_map_entities.clear()
-        self.map_with_entities_pixmap = self.map_pixmap.copy()
+        # Party Level
+        level_layout = QHBoxLayout()
+        self.party_level_input = QSpinBox(self)
+        self.party_level_input.setRange(1, 20)
+        self.party_level_input.setValue(5)
+        self.party_level_input.editingFinished.connect(self._prefetch_placement_entities)
+        level_layout.addWidget(QLabel("Party Level:", self))
+        level_layout.addWidget(self.party_level_input)
+        entity_layout.addLayout(level_layout)
 
-        # Initialize painter
-        painter = QPainter(self.map_with_entities_pixmap)
-        tile_size = 20
-        font = QFont("Arial", 8)
-        painter.setFont(font)
-
-        # Color coding for entities
-        colors = {
-            "Monsters": QColor("#FF0000"),  # Red
-            "Magic Items": QColor("#00FF00"),  # Green
-            "Armor": QColor("#0000FF"),  # Blue
-            "Weapons": QColor("#FFFF00")  # Yellow
-        }
+        # Place Button
+        place_button = QPushButton("Place Entities", self)
+        place_button.clicked.connect(self._place_entities)
+        entity_layout.addWidget(place_button)
 
-        # Prepare placement list
-        placement_list = []
-        for entity_type, qty in entity_requests.items():
-            placement_list.extend([(entity_type, qty) for _ in range(qty)])
-        random.shuffle(placement_list)  # Randomize order to distribute entities evenly
+        entity_group.setLayout(entity_layout)
+        controls_layout.addWidget(entity_group)
 
-        # Place entities
-        placed = []
-        used_rooms = set()
-        for entity_type, _ in placement_list[:max_entities]:
-            entities = available_entities[entity_type]
-            entity = random.choice(entities)
-            # Prefer unused rooms if available
-            available_rooms = [r for i, r in enumerate(self.current_map_rooms) if i not in used_rooms]
-            if not available_rooms:
-                available_rooms = self.current_map_rooms
-            room = random.choice(available_rooms)
-            room_idx = self.current_map_rooms.index(room)
-            used_rooms.add(room_idx)
-            rx, ry, rw, rh = room
-
-            # Ensure valid placement
-            px = random.randint(rx + 1, rx + rw - 2)
-            py = random.randint(ry + 1, ry + rh - 2)
-
-            # Draw entity
-            painter.setBrush(QBrush(colors[entity_type]))
-            painter.setPen(QPen(Qt.PenStyle.NoPen))
-            painter.drawEllipse(px * tile_size, py * tile_size, tile_size, tile_size)
-            painter.setPen(QPen(QColor("#FFFFFF")))
-            name = getattr(entity, "name", "X")[:1]
-            painter.drawText(px * tile_size, py * tile_size, tile_size, tile_size,
-                             Qt.AlignmentFlag.AlignCenter, name)
-
-            # Store entity
-            self.active_map_entities.append({
-                "type": entity_type,
-                "data": entity,
-                "map_x": px,
-                "map_y": py,
-                "room": room
-            })
-            placed.append((entity_type, entity, px, py, room))
-
-            # Add monsters to combat tracker
-            if entity_type == "Monsters":
-                try:
-                    name = getattr(entity, "name", "Unknown Monster")
-                    hp = getattr(entity, "hp", 10)  # Default HP if missing
-                    self.add_combatant(name=name, hp=hp)
-                    self._append_to_combat_log(f"Added {name} (HP: {hp}) to combat tracker.")
-                except Exception as e:
-                    self._append_to_combat_log(f"Error adding {name} to combat tracker: {str(e)}")
+        # Map Description
+        desc_group = QGroupBox("Map Description")
+        desc_layout = QVBoxLayout()
+        self.map_description = QTextEdit(self)
+        self.map_description.setReadOnly(True)
+        self.map_description.setPlaceholderText("Map details will appear here...")
+        desc_layout.addWidget(self.map_description)
+        desc_group.setLayout(desc_layout)
+        controls_layout.addWidget(desc_group)
 
-        painter.end()
-        self._update_map_display()
+        controls_layout.addStretch()
 
-        # Update description
-        desc = self.map_description.toPlainText().split("\nPlaced Entities:\n")[0]  # Keep original map desc
-        desc += "\nPlaced Entities:\n"
-        for i, (entity_type, entity, x, y, room) in enumerate(placed, 1):
-            name = getattr(entity, "name", "Unknown")
-            desc += f"{i}. {entity_type}: {name} at ({x},{y}) in Room {self.current_map_rooms.index(room) + 1}\n"
-        self.map_description.setPlainText(desc)
+        # Map Display
+        self.map_label = QLabel(self)
+        self.map_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.map_label.setMinimumSize(300, 200)
+        # The pixmap follows the label's size, so it must not feed back into the label's size hint
+        self.map_label.setSizePolicy(QSizePolicy.Policy.Ignored, QSizePolicy.Policy.Ignored)
+        self.map_label.installEventFilter(self)
+        self.map_smooth_timer = QTimer(self)
+        self.map_smooth_timer.setSingleShot(True)
+        self.map_smooth_timer.setInterval(self.MAP_SMOOTH_RESCALE_MS)
+        self.map_smooth_timer.timeout.connect(self._update_map_display)
+        self.map_pixmap = None
+        self.map_entity_overlay = None  # Transparent layer holding entity markers, drawn over map_pixmap
+        self.map_display_key = None  # What the label's current pixmap was rendered from
+
+        splitter = QSplitter(Qt.Orientation.Horizontal)
+        splitter.addWidget(controls_widget)
+        splitter.addWidget(self.map_label)
+        splitter.setSizes([300, 900])
+
+        layout.addWidget(splitter)
+        self.central_widget.addTab(map_tab, "Map Generator")
+
+        # Initialize map
+        self._on_generate_map_clicked()
+        logging.debug("Map generator tab created")
 
-        self._append_to_combat_log(f"Placed {len(placed)} entities: {', '.join([f'{t}' for t, _, _, _, _ in placed])}")
-        self.statusBar().showMessage(f"Placed {len(placed)} entities on the map.")
     def _on_generate_map_clicked(self):
         try:
             width = int(self.map_width_input.text())
@@ -1840,25 +2099,48 @@ class DungeonMasterAssistant(QMainWindow):
         # Generate rooms
         num_rooms = max(3, (width * height) // 100)
         rooms = []
-        for _ in range(num_rooms * 2):  # Try more to ensure enough rooms
-            rw = random.randint(3, min(6, width - 2))
-            rh = random.randint(3, min(6, height - 2))
-            rx = random.randint(1, width - rw - 1)
-            ry = random.randint(1, height - rh - 1)
-
-            # Check overlap
-            overlap = False
-            for ex, ey, ew, eh in rooms:
-                if (rx < ex + ew + 1 and rx + rw + 1 > ex and
-                        ry < ey + eh + 1 and ry + rh + 1 > ey):
-                    overlap = True
-                    break
-            if overlap:
-                continue
-
-            # Carve room
-            grid[rx:rx + rw, ry:ry + rh] = 0
+        occupied = np.zeros((width, height), dtype=bool)
+
+        def carve_room(rx, ry, rw, rh):
+            # Rooms stay inside the outer wall and keep a one-tile gap around existing rooms
+            if rx < 1 or ry < 1 or rx + rw > width - 1 or ry + rh > height - 1:
+                return False
+            if occupied[rx - 1:rx + rw + 1, ry - 1:ry + rh + 1].any():
+                return False
+            room = (slice(rx, rx + rw), slice(ry, ry + rh))
+            grid[room] = 0
+            occupied[room] = True
             rooms.append((rx, ry, rw, rh))
+            return True
+
+        def room_size():
+            return random.randint(3, min(6, width - 2)), random.randint(3, min(6, height - 2))
+
+        # Seed a room at random, then grow new rooms off the edges of placed ones until the frontier
+        # runs dry; a fresh random seed picks up from there
+        for _ in range(num_rooms * 2):
+            if len(rooms) >= num_rooms:
+                break
+            rw, rh = room_size()
+            if not carve_room(random.randint(1, width - rw - 1), random.randint(1, height - rh - 1), rw, rh):
+                continue
+            frontier = [rooms[-1]]
+            while frontier and len(rooms) < num_rooms:
+                px, py, pw, ph = frontier.pop()
+                for side in random.sample(("N", "E", "S", "W"), 4):
+                    for _ in range(3):  # A few sizes per side before giving up on it
+                        rw, rh = room_size()
+                        if side in ("E", "W"):
+                            rx = px + pw + 1 if side == "E" else px - rw - 1
+                            ry = random.randint(py - rh + 1, py + ph - 1)
+                        else:
+                            rx = random.randint(px - rw + 1, px + pw - 1)
+                            ry = py + ph + 1 if side == "S" else py - rh - 1
+                        if carve_room(rx, ry, rw, rh):
+                            frontier.append(rooms[-1])
+                            break
+                    if len(rooms) >= num_rooms:
+                        break
 
         # Connect rooms
         for i in range(len(rooms) - 1):
@@ -1868,35 +2150,24 @@ class DungeonMasterAssistant(QMainWindow):
             cx2, cy2 = x2 + w2 // 2, y2 + h2 // 2
 
             # Horizontal corridor
-            for x in range(min(cx1, cx2), max(cx1, cx2) + 1):
-                grid[x, cy1] = 0
+            grid[min(cx1, cx2):max(cx1, cx2) + 1, cy1] = 0
             # Vertical corridor
-            for y in range(min(cy1, cy2), max(cy1, cy2) + 1):
-                grid[cx2, y] = 0
+            grid[cx2, min(cy1, cy2):max(cy1, cy2) + 1] = 0
 
         self.current_map_rooms = rooms
 
-        # Render map
+        # Render map: one palette byte per pixel (0 floor, 1 wall), scaled up to tile_size blocks
+        # (grid is indexed [x, y])
         tile_size = 16
-        image = QImage(width * tile_size, height * tile_size, QImage.Format.Format_RGB32)
-        image.fill(Qt.GlobalColor.black)
-
-        try:
-            painter = QPainter(image)
-            wall_brush = QBrush(QColor("#333333"))
-            floor_brush = QBrush(QColor("#CCCCCC"))
-            painter.setPen(QPen(Qt.PenStyle.NoPen))
-
-            for x in range(width):
-                for y in range(height):
-                    painter.setBrush(wall_brush if grid[x, y] else floor_brush)
-                    painter.drawRect(x * tile_size, y * tile_size, tile_size, tile_size)
-        finally:
-            if painter:
-                painter.end()
-
-        self.map_pixmap = QPixmap.fromImage(image)
-        self.map_with_entities_pixmap = self.map_pixmap.copy() if self.map_pixmap else None
+        tiles = grid.T.astype(np.uint8)
+        pixels = np.ascontiguousarray(tiles.repeat(tile_size, axis=0).repeat(tile_size, axis=1))
+        image = QImage(pixels.data, width * tile_size, height * tile_size, pixels.strides[0],
+                       QImage.Format.Format_Indexed8)
+        image.setColorTable([QColor("#CCCCCC").rgb(), QColor("#333333").rgb()])
+
+        self.map_pixmap = QPixmap.fromImage(image)  # Copies the pixels, so the buffer can go
+        self.map_entity_overlay = QPixmap(self.map_pixmap.size())
+        self.map_entity_overlay.fill(Qt.GlobalColor.transparent)
         self._update_map_display()
 
         # Generate description
@@ -1917,8 +2188,9 @@ class DungeonMasterAssistant(QMainWindow):
 
         self.map_description.setPlainText(desc)
         self._append_to_combat_log(f"Generated {theme} map with {len(rooms)} rooms.")
-        self.statusBar().showMessage(f"Generated {theme} map: {width}x{height}, {len(rooms)} rooms.")
+        self._show_status(f"Generated {theme} map: {width}x{height}, {len(rooms)} rooms.")
         logging.debug(f"Map generated: {len(rooms)} rooms")
+        self._prefetch_placement_entities()  # Entities are usually placed next
 
     def _place_entities(self):
         logging.debug("Starting _place_entities")
@@ -1928,38 +2200,21 @@ class DungeonMasterAssistant(QMainWindow):
             logging.debug("No rooms available")
             return
 
-        # Validate party level
-        try:
-            party_level = int(self.party_level_input.text())
-            if not 1 <= party_level <= 20:
-                raise ValueError("Party level must be between 1 and 20.")
-        except ValueError as e:
-            QMessageBox.warning(self, "Input Error", f"Invalid party level: {str(e)}")
-            self._append_to_combat_log(f"Error: Invalid party level: {str(e)}")
-            logging.debug(f"Invalid party level: {str(e)}")
-            return
+        # The spin boxes only hold in-range values
+        party_level = self.party_level_input.value()
 
         # Collect selected entity types and quantities
         entity_requests = {}
         total_quantity = 0
         for entity_type in self.entity_checkboxes:
             if self.entity_checkboxes[entity_type].isChecked():
-                try:
-                    qty = int(self.entity_quantity_inputs[entity_type].text())
-                    if not 0 <= qty <= 5:
-                        raise ValueError(f"Quantity for {entity_type} must be between 0 and 5.")
-                    if qty > 0:
-                        entity_requests[entity_type] = qty
-                        total_quantity += qty
-                except ValueError as e:
-                    QMessageBox.warning(self, "Input Error", str(e))
-                    self._append_to_combat_log(f"Error: {str(e)}")
-                    logging.debug(f"Invalid quantity for {entity_type}: {str(e)}")
-                    return
+                qty = self.entity_quantity_inputs[entity_type].value()
+                if qty > 0:
+                    entity_requests[entity_type] = qty
+                    total_quantity += qty
 
         if not entity_requests:
-            QMessageBox.warning(self, "Selection Error",
-                                "Please select at least one entity type with a quantity greater than 0.")
+            self._warn_selection("Please select at least one entity type with a quantity greater than 0.")
             self._append_to_combat_log("Error: No entity types selected for placement.")
             logging.debug("No entity types selected")
             return
@@ -1976,120 +2231,86 @@ class DungeonMasterAssistant(QMainWindow):
 
         # Fetch entities
         available_entities = {}
-        db_session = SessionLocal()
         try:
             for entity_type, qty in entity_requests.items():
-                logging.debug(f"Querying {entity_type}")
-                if entity_type == "Monsters":
-                    cr_max = max(1, party_level // 2)
-                    query = db_session.query(Monster).filter(Monster.cr.in_([str(i) for i in range(1, cr_max + 1)]))
-                    entities = query.limit(50).all()
-                elif entity_type == "Magic Items":
-                    rarities = ["Common", "Uncommon", "Rare"] if party_level < 10 else ["Common", "Uncommon", "Rare",
-                                                                                        "Very Rare"]
-                    query = db_session.query(MagicItem).filter(MagicItem.rarity.in_(rarities))
-                    entities = query.limit(50).all()
-                elif entity_type == "Armor":
-                    query = db_session.query(Armor)
-                    entities = query.limit(50).all()
-                elif entity_type == "Weapons":
-                    query = db_session.query(Weapon)
-                    entities = query.limit(50).all()
-
+                entities = self._placement_entities(entity_type, party_level)
                 if not entities:
                     QMessageBox.warning(self, "Placement Error", f"No {entity_type} found in database.")
                     self._append_to_combat_log(f"Error: No {entity_type} found in database.")
-                    logging.debug(f"No {entity_type} found")
+                    logging.debug("No %s found", entity_type)
                     return
                 available_entities[entity_type] = entities
                 self._append_to_combat_log(f"Found {len(entities)} {entity_type} for placement.")
-                logging.debug(f"Found {len(entities)} {entity_type}")
+                logging.debug("Found %d %s", len(entities), entity_type)
         except Exception as e:
             self._append_to_combat_log(f"Database error: {str(e)}")
             logging.error(f"Database error: {str(e)}")
             return
-        finally:
-            db_session.close()
-            logging.debug("Database session closed")
 
         # Clear existing entities
         self.active_map_entities.clear()
         logging.debug("Cleared active_map_entities")
 
-        # Initialize pixmap
-        try:
-            self.map_with_entities_pixmap = self.map_pixmap.copy() if self.map_pixmap else None
-            if self.map_with_entities_pixmap is None or self.map_with_entities_pixmap.isNull():
-                raise ValueError("Invalid map pixmap")
-        except Exception as e:
-            QMessageBox.critical(self, "Pixmap Error", f"Failed to copy map pixmap: {str(e)}")
-            self._append_to_combat_log(f"Error copying pixmap: {str(e)}")
-            logging.error(f"Pixmap error: {str(e)}")
+        # Clear the entity overlay; the base map itself is never redrawn
+        if self.map_entity_overlay is None or self.map_entity_overlay.isNull():
+            QMessageBox.critical(self, "Pixmap Error", "No map pixmap to place entities on.")
+            self._append_to_combat_log("Error: No map pixmap to place entities on.")
+            logging.error("Pixmap error: entity overlay missing")
             return
+        self.map_entity_overlay.fill(Qt.GlobalColor.transparent)
 
         # Initialize painter
         painter = None
         try:
-            painter = QPainter(self.map_with_entities_pixmap)
+            painter = QPainter(self.map_entity_overlay)
             tile_size = 16
-            font = QFont("Arial", 8)
-            painter.setFont(font)
         except Exception as e:
             QMessageBox.critical(self, "Painter Error", f"Failed to initialize QPainter: {str(e)}")
             self._append_to_combat_log(f"Error initializing QPainter: {str(e)}")
             logging.error(f"Painter error: {str(e)}")
             return
 
-        # Color coding
-        colors = {
-            "Monsters": QColor("#FF0000"),
-            "Magic Items": QColor("#00FF00"),
-            "Armor": QColor("#0000FF"),
-            "Weapons": QColor("#FFFF00")
-        }
-
         # Prepare placement list
         placement_list = []
         for entity_type, qty in entity_requests.items():
-            placement_list.extend([(entity_type, qty) for _ in range(qty)])
+            placement_list.extend([entity_type] * qty)
         random.shuffle(placement_list)
         logging.debug(f"Placement list: {len(placement_list)} items")
 
-        # Place entities
+        # Place entities, each in a different room until every room has been used
         placed = []
-        used_rooms = set()
+        unused_rooms = []
+        placement_list = placement_list[:max_entities]
+        # Draw every entity pick and position up front; each [0, 1) draw is scaled to its range below
+        rng = np.random.default_rng()
+        entity_draws = rng.random(len(placement_list)).tolist()
+        position_draws = rng.random((len(placement_list), 2)).tolist()
         try:
-            for i, (entity_type, _) in enumerate(placement_list[:max_entities]):
-                logging.debug(f"Placing {entity_type} #{i + 1}")
+            for i, entity_type in enumerate(placement_list):
+                logging.debug("Placing %s #%d", entity_type, i + 1)
                 entities = available_entities[entity_type]
-                entity = random.choice(entities)
-                available_rooms = [r for j, r in enumerate(self.current_map_rooms) if j not in used_rooms]
-                if not available_rooms:
-                    available_rooms = self.current_map_rooms
-                room = random.choice(available_rooms)
-                room_idx = self.current_map_rooms.index(room)
-                used_rooms.add(room_idx)
+                entity = entities[int(entity_draws[i] * len(entities))]
+                if not unused_rooms:
+                    unused_rooms = rng.permutation(len(self.current_map_rooms)).tolist()
+                room_idx = unused_rooms.pop()
+                room = self.current_map_rooms[room_idx]
                 rx, ry, rw, rh = room
 
                 # Validate placement
                 if rw <= 2 or rh <= 2:
                     self._append_to_combat_log(f"Skipping invalid room {room_idx + 1} with size {rw}x{rh}")
-                    logging.debug(f"Invalid room {room_idx + 1}: {rw}x{rh}")
+                    logging.debug("Invalid room %d: %dx%d", room_idx + 1, rw, rh)
                     continue
 
-                px = random.randint(rx + 1, rx + rw - 2)
-                py = random.randint(ry + 1, ry + rh - 2)
-                logging.debug(f"Position for {entity_type}: ({px}, {py})")
+                px = rx + 1 + int(position_draws[i][0] * (rw - 2))
+                py = ry + 1 + int(position_draws[i][1] * (rh - 2))
+                logging.debug("Position for %s: (%d, %d)", entity_type, px, py)
 
                 # Draw entity
-                painter.setBrush(QBrush(colors[entity_type]))
-                painter.setPen(QPen(Qt.PenStyle.NoPen))
-                painter.drawEllipse(px * tile_size, py * tile_size, tile_size, tile_size)
-                painter.setPen(QPen(QColor("#FFFFFF")))
                 name = getattr(entity, "name", "X")[:1]
-                painter.drawText(px * tile_size, py * tile_size, tile_size, tile_size,
-                                 Qt.AlignmentFlag.AlignCenter, name)
-                logging.debug(f"Drew {entity_type} '{name}' at ({px}, {py})")
+                painter.drawPixmap(px * tile_size, py * tile_size,
+                                   self._entity_marker(entity_type, name, tile_size))
+                logging.debug("Drew %s '%s' at (%d, %d)", entity_type, name, px, py)
 
                 # Store entity
                 self.active_map_entities.append({
@@ -2099,7 +2320,7 @@ class DungeonMasterAssistant(QMainWindow):
                     "map_y": py,
                     "room": room
                 })
-                placed.append((entity_type, entity, px, py, room))
+                placed.append((entity_type, entity, px, py, room_idx))
 
                 # Add monsters to combat tracker
                 if entity_type == "Monsters":
@@ -2110,12 +2331,10 @@ class DungeonMasterAssistant(QMainWindow):
                             hp = 10
                         self.add_combatant(name=name, hp=hp)
                         self._append_to_combat_log(f"Added {name} (HP: {hp}) to combat tracker.")
-                        logging.debug(f"Added {name} (HP: {hp}) to combat tracker")
+                        logging.debug("Added %s (HP: %s) to combat tracker", name, hp)
                     except Exception as e:
                         self._append_to_combat_log(f"Error adding {name} to combat tracker: {str(e)}")
                         logging.error(f"Combat tracker error for {name}: {str(e)}")
-
-                QApplication.processEvents()
         except Exception as e:
             self._append_to_combat_log(f"Placement error: {str(e)}")
             logging.error(f"Placement error: {str(e)}")
@@ -2126,39 +2345,96 @@ class DungeonMasterAssistant(QMainWindow):
 
         # Update description
         try:
-            desc = self.map_description.toPlainText().split("\nPlaced Entities:")[0]
-            desc += "\nPlaced Entities:\n"
-            for i, (entity_type, entity, x, y, room) in enumerate(placed, 1):
-                name = getattr(entity, "name", "Unknown")
-                desc += f"{i}. {entity_type}: {name} at ({x},{y}) in Room {self.current_map_rooms.index(room) + 1}\n"
-            self.map_description.setPlainText(desc)
+            lines = [self.map_description.toPlainText().split("\nPlaced Entities:")[0], "Placed Entities:"]
+            lines.extend(f"{i}. {entity_type}: {getattr(entity, 'name', 'Unknown')} at ({x},{y}) in Room {room_idx + 1}"
+                         for i, (entity_type, entity, x, y, room_idx) in enumerate(placed, 1))
+            lines.append("")
+            self.map_description.setPlainText("\n".join(lines))
         except Exception as e:
             self._append_to_combat_log(f"Description update error: {str(e)}")
             logging.error(f"Description error: {str(e)}")
 
         self._update_map_display()
         self._append_to_combat_log(f"Placed {len(placed)} entities")
-        self.statusBar().showMessage(f"Placed {len(placed)} entities on the map.")
+        self._show_status(f"Placed {len(placed)} entities on the map.")
         logging.debug(f"Completed placement: {len(placed)} entities")
+
+    @classmethod
+    def _entity_marker(cls, entity_type, letter, tile_size):
+        """Returns the map marker for an entity, drawing it only on a QPixmapCache miss."""
+        key = f"marker:{entity_type}:{letter}:{tile_size}"
+        marker = QPixmapCache.find(key)
+        if marker is None:
+            marker = QPixmap(tile_size, tile_size)
+            marker.fill(Qt.GlobalColor.transparent)
+            painter = QPainter(marker)
+            try:
+                painter.setFont(QFont("Arial", 8))
+                painter.setBrush(cls.ENTITY_MARKER_BRUSHES[entity_type])
+                painter.setPen(cls.MARKER_OUTLINE_PEN)
+                painter.drawEllipse(0, 0, tile_size, tile_size)
+                painter.setPen(cls.MARKER_TEXT_PEN)
+                painter.drawText(0, 0, tile_size, tile_size, Qt.AlignmentFlag.AlignCenter, letter)
+            finally:
+                painter.end()
+            QPixmapCache.insert(key, marker)
+        return marker
+
     def _save_map_as_image(self):
-        if self.map_with_entities_pixmap and not self.map_with_entities_pixmap.isNull():
+        if self.map_pixmap and not self.map_pixmap.isNull():
             timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
             default_filename = f"map_{timestamp}.png"
             file_path, _ = QFileDialog.getSaveFileName(self, "Save Map Image", default_filename,
                                                        "PNG Images (*.png);;All Files (*)")
             if file_path:
-                self.map_with_entities_pixmap.save(file_path)
-                self.statusBar().showMessage(f"Map saved to '{os.path.basename(file_path)}'")
+                # Compose on the GUI thread, encode and write on the pool
+                runnable = ImageSaveRunnable(self._map_with_entities(self.map_pixmap).toImage(), file_path)
+                runnable.signals.done.connect(self._on_map_image_saved)
+                runnable.signals.failed.connect(self._on_map_image_save_failed)
+                self._show_status(f"Saving map to '{os.path.basename(file_path)}'...")
+                QThreadPool.globalInstance().start(runnable)
         else:
             QMessageBox.warning(self, "No Map", "No map has been generated to save.")
 
-    def _update_map_display(self):
-        if self.map_with_entities_pixmap and not self.map_with_entities_pixmap.isNull():
-            self.map_label.setPixmap(self.map_with_entities_pixmap.scaled(
+    def _on_map_image_saved(self, file_path):
+        self._show_status(f"Map saved to '{os.path.basename(file_path)}'")
+
+    def _on_map_image_save_failed(self, file_path, error_text):
+        logging.error(f"Could not save map image to {file_path}: {error_text}")
+        QMessageBox.critical(self, "Save Error", f"Could not save map image:\n{error_text}")
+
+    def _update_map_display(self, transformation=Qt.TransformationMode.SmoothTransformation):
+        if self.map_pixmap and not self.map_pixmap.isNull():
+            # cacheKey() changes whenever a pixmap is repainted, so this only skips true repeats
+            key = (self.map_pixmap.cacheKey(), self.map_entity_overlay.cacheKey(),
+                   self.map_label.width(), self.map_label.height(), transformation)
+            if key == self.map_display_key:
+                return
+            self.map_display_key = key
+            self.map_label.setPixmap(self._map_with_entities(self.map_pixmap.scaled(
                 self.map_label.size(),
                 Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.SmoothTransformation
-            ))
+                transformation
+            )))
+
+    def eventFilter(self, watched, event):
+        if watched is getattr(self, "map_label", None) and event.type() == QEvent.Type.Resize:
+            # Cheap rescale per resize step; the smooth one runs once resizing pauses
+            self._update_map_display(Qt.TransformationMode.FastTransformation)
+            self.map_smooth_timer.start()
+        return super().eventFilter(watched, event)
+
+    def _map_with_entities(self, base):
+        """Draws the entity overlay over base, a copy of the map at any scale, and returns it."""
+        if base is self.map_pixmap:
+            base = base.copy()
+        painter = QPainter(base)
+        try:
+            painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+            painter.drawPixmap(base.rect(), self.map_entity_overlay)
+        finally:
+            painter.end()
+        return base
 
     def create_combat_tracker_tab(self):
         """Create and initialize the combat tracker tab."""
@@ -2174,22 +2450,37 @@ class DungeonMasterAssistant(QMainWindow):
         layout.addWidget(self.round_counter_label)
 
         # Combat log
-        self.combat_log = QTextEdit()
+        self.combat_log = QPlainTextEdit()
         self.combat_log.setReadOnly(True)
         self.combat_log.setMinimumHeight(100)
         layout.addWidget(self.combat_log)
+        # Lines logged within one event-loop pass are appended together
+        self.pending_combat_log = []
+        self.combat_log_timer = QTimer(self)
+        self.combat_log_timer.setSingleShot(True)
+        self.combat_log_timer.setInterval(0)
+        self.combat_log_timer.timeout.connect(self._flush_combat_log)
 
         # Initiative table
-        self.initiative_table = QTableWidget()
-        self.initiative_table.setColumnCount(3)
-        self.initiative_table.setHorizontalHeaderLabels(["Name", "Initiative", "HP"])
+        self.initiative_model = CombatTableModel(
+            [("Name", "name"), ("Initiative", "initiative"), ("HP", "hp")],
+            row_brush=self._combatant_background, parent=self)
+        self.initiative_table = QTableView()
+        self.initiative_table.setModel(self.initiative_model)
+        self.initiative_table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
         self.initiative_table.setSortingEnabled(True)
         layout.addWidget(self.initiative_table)
 
         # Ailment table
-        self.ailment_table = QTableWidget()
-        self.ailment_table.setColumnCount(4)
-        self.ailment_table.setHorizontalHeaderLabels(["Target", "Ailment", "Duration", "Source"])
+        self.ailment_model = CombatTableModel(
+            [("Target", "target"), ("Ailment", "ailment"), ("Duration", "duration"), ("Source", "source")],
+            parent=self)
+        # Inline edits (HP, initiative, durations) go through setData and must be auto-saved too
+        self.initiative_model.dataChanged.connect(self._mark_combat_state_dirty)
+        self.ailment_model.dataChanged.connect(self._mark_combat_state_dirty)
+        self.ailment_table = QTableView()
+        self.ailment_table.setModel(self.ailment_model)
+        self.ailment_table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
         self.ailment_table.setSortingEnabled(True)
         layout.addWidget(self.ailment_table)
 
@@ -2197,12 +2488,13 @@ class DungeonMasterAssistant(QMainWindow):
         input_layout = QHBoxLayout()
         self.name_input = QLineEdit()
         self.name_input.setPlaceholderText("Combatant Name")
-        self.hp_input = QLineEdit()
-        self.hp_input.setPlaceholderText("HP")
-        self.hp_input.setValidator(QIntValidator(0, 9999))
-        self.initiative_input = QLineEdit()
-        self.initiative_input.setPlaceholderText("Initiative (optional)")
-        self.initiative_input.setValidator(QIntValidator(0, 99))
+        self.hp_input = QSpinBox()
+        self.hp_input.setRange(1, 9999)
+        self.hp_input.setPrefix("HP: ")
+        self.initiative_input = QSpinBox()
+        self.initiative_input.setRange(0, 99)
+        self.initiative_input.setPrefix("Initiative: ")
+        self.initiative_input.setSpecialValueText("Initiative: roll d20")
         input_layout.addWidget(self.name_input)
         input_layout.addWidget(self.hp_input)
         input_layout.addWidget(self.initiative_input)
@@ -2214,9 +2506,10 @@ class DungeonMasterAssistant(QMainWindow):
         self.ailment_target_input.setPlaceholderText("Target Name")
         self.ailment_name_input = QLineEdit()
         self.ailment_name_input.setPlaceholderText("Ailment Name")
-        self.ailment_duration_input = QLineEdit()
-        self.ailment_duration_input.setPlaceholderText("Duration (turns)")
-        self.ailment_duration_input.setValidator(QIntValidator(1, 99))
+        self.ailment_duration_input = QSpinBox()
+        self.ailment_duration_input.setRange(1, 99)
+        self.ailment_duration_input.setPrefix("Duration: ")
+        self.ailment_duration_input.setSuffix(" turns")
         ailment_input_layout.addWidget(self.ailment_target_input)
         ailment_input_layout.addWidget(self.ailment_name_input)
         ailment_input_layout.addWidget(self.ailment_duration_input)
@@ -2263,8 +2556,7 @@ class DungeonMasterAssistant(QMainWindow):
         self.tab_initialized["combat_tracker"] = True
         logging.debug("Combat tracker tab created")
 
-    def create_session_manager_tab(self):
-        session_tab = QWidget()
+    def create_session_manager_tab(self, session_tab):
         session_tab.setObjectName("session_manager_tab")
         main_layout = QVBoxLayout(session_tab)
         playback_group = QGroupBox("Playback & Analysis")
@@ -2273,7 +2565,7 @@ class DungeonMasterAssistant(QMainWindow):
         self.load_button = QPushButton("Load Session", self)
         self.load_button.clicked.connect(self.load_session)
         self.play_button = QPushButton("Play", self)
-        self.play_button.clicked.connect(self.play_recording)
+        self.play_button.clicked.connect(self._on_play_clicked)
         self.transcribe_button = QPushButton("Transcribe...", self)
         self.transcribe_button.clicked.connect(self.run_transcription)
         playback_controls_layout.addWidget(self.load_button)
@@ -2285,6 +2577,8 @@ class DungeonMasterAssistant(QMainWindow):
         playback_main_layout.addLayout(playback_controls_layout)
         self.playback_slider = QSlider(Qt.Orientation.Horizontal, self)
         self.playback_slider.setTracking(True)
+        self.playback_slider.setSingleStep(self.PLAYBACK_SLIDER_STEPS)
+        self.playback_slider.setPageStep(10 * self.PLAYBACK_SLIDER_STEPS)
         self.playback_slider.sliderMoved.connect(self.seek_audio)
         self.playback_slider.sliderReleased.connect(self.seek_audio)
         playback_main_layout.addWidget(self.playback_slider)
@@ -2357,7 +2651,6 @@ class DungeonMasterAssistant(QMainWindow):
         self.mic_level_bar.setVisible(False)
         self.playback_slider.setEnabled(False)
         self.transcribe_button.setEnabled(False)
-        self.central_widget.addTab(session_tab, "Session Manager")
 
     def _save_api_key(self, api_key):
         """Saves the Gemini API key to a config file."""
@@ -2367,37 +2660,38 @@ class DungeonMasterAssistant(QMainWindow):
                 json.dump(config, f)
         except IOError as e:
             print(f"Warning: Could not save API key to '{self.CONFIG_FILE}': {e}")
-            self.statusBar().showMessage("Warning: Could not save API key.")
+            self._show_status("Warning: Could not save API key.")
 
     def _load_api_key(self):
         """Loads the Gemini API key from the config file."""
-        if os.path.exists(self.CONFIG_FILE):
+        config_file = Path(self.CONFIG_FILE)
+        if config_file.exists():
             try:
-                with open(self.CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                    return config.get('gemini_api_key')
+                config = json.loads(config_file.read_bytes())
+                return config.get('gemini_api_key')
             except (IOError, json.JSONDecodeError) as e:
                 print(f"Error reading API key from '{self.CONFIG_FILE}': {e}")
-                self.statusBar().showMessage("Error loading API key from config.")
+                self._show_status("Error loading API key from config.")
         return None
 
-    def _get_gemini_api_key(self):
-        """Loads the Gemini API key from config or prompts the user if not found/invalid."""
-        api_key = self._load_api_key()
+    def _get_gemini_api_key(self, use_saved_key=True):
+        """Loads the Gemini API key from config or prompts the user if not found/invalid.
+
+        A saved key was validated when it was entered, so it is configured without a test call;
+        if Gemini later rejects it, on_generation_finished prompts again with use_saved_key=False.
+        """
+        api_key = self._load_api_key() if use_saved_key else None
 
         if api_key:
             try:
                 genai.configure(api_key=api_key.strip())
-                # Attempt a dummy call to verify the key
-                test_model = genai.GenerativeModel('gemini-1.5-flash-latest')
-                test_model.generate_content("test")
-                self.gemini_model = genai.GenerativeModel('gemini-1.5-pro-latest')
-                self.statusBar().showMessage("Gemini API key loaded from config and validated.")
+                self._create_gemini_models()
+                self._show_status("Gemini API key loaded from config.")
                 self.set_ai_buttons_enabled(True)
-                return  # Successfully loaded and validated
+                return  # Successfully loaded
             except Exception as e:
                 QMessageBox.warning(self, "Saved API Key Error",
-                                    f"The saved Gemini API Key is invalid or there was a connection error: {e}\n"
+                                    f"The saved Gemini API Key could not be configured: {e}\n"
                                     "Please enter a new key.")
                 api_key = None  # Invalidate the loaded key
 
@@ -2418,9 +2712,9 @@ class DungeonMasterAssistant(QMainWindow):
                     # Attempt a dummy call to verify the new key
                     test_model = genai.GenerativeModel('gemini-1.5-flash-latest')
                     test_model.generate_content("test")
-                    # Set the main model
-                    self.gemini_model = genai.GenerativeModel('gemini-1.5-pro-latest')
-                    self.statusBar().showMessage("Gemini API key validated, configured, and saved.")
+                    # Set the main models
+                    self._create_gemini_models()
+                    self._show_status("Gemini API key validated, configured, and saved.")
                     self._save_api_key(new_api_key.strip())  # Save the new valid key
                     self.set_ai_buttons_enabled(True)
                     break  # Break the loop as we have a valid model
@@ -2436,6 +2730,12 @@ class DungeonMasterAssistant(QMainWindow):
                 self.set_ai_buttons_enabled(False)
                 break  # Exit the loop
 
+    def _create_gemini_models(self):
+        """Creates the AI Assistant and transcription models for the configured API key."""
+        self.gemini_model = genai.GenerativeModel('gemini-1.5-pro-latest',
+                                                  system_instruction=self.DM_SYSTEM_PROMPT)
+        self.transcription_model = genai.GenerativeModel('gemini-1.5-pro-latest')
+
     def set_ai_buttons_enabled(self, is_enabled):
         if self.gemini_model is None:
             is_enabled = False
@@ -2453,24 +2753,28 @@ class DungeonMasterAssistant(QMainWindow):
             self.set_ai_buttons_enabled(False)
             return
         self.set_ai_buttons_enabled(False)
-        self.statusBar().showMessage("Analyzing text with Gemini...")
+        self._show_status("Analyzing text with Gemini...")
         self.gemini_worker = GeminiWorker(model=self.gemini_model, prompt=full_prompt)
         self.gemini_worker.generation_finished.connect(self.on_generation_finished)
         self.gemini_worker.finished.connect(self.gemini_worker.deleteLater)
         self.gemini_worker.start()
 
     def on_generation_finished(self, result_text, error_text):
-        if error_text:
+        if error_text and any(marker in error_text for marker in self.API_KEY_ERROR_MARKERS):
+            QMessageBox.critical(self, "API Key Error",
+                                 f"Gemini rejected the saved API key:\n{error_text}\nPlease enter a new key.")
+            self.gemini_model = None
+            self._get_gemini_api_key(use_saved_key=False)
+        elif error_text:
             QMessageBox.critical(self, "API Error", f"An error occurred:\n{error_text}")
         else:
             dialog = ResponseDialog(result_text, self)
             dialog.timestamp_clicked.connect(self.play_recording)
             dialog.exec()
         self.set_ai_buttons_enabled(True)
-        self.statusBar().showMessage("Ready")
+        self._show_status("Ready")
 
-    def create_ai_assistant_tab(self):
-        ai_tab = QWidget()
+    def create_ai_assistant_tab(self, ai_tab):
         ai_tab.setObjectName("ai_assistant_tab")
         layout = QVBoxLayout(ai_tab)
         layout.addWidget(QLabel("<h2>Gemini AI Assistant</h2>", self))
@@ -2540,7 +2844,7 @@ class DungeonMasterAssistant(QMainWindow):
         layout.addWidget(predefined_prompts_group)
 
         layout.addStretch()
-        self.central_widget.addTab(ai_tab, "AI Assistant")
+        self.set_ai_buttons_enabled(True)  # Stays disabled until a Gemini model is configured
 
     def _on_ai_query_clicked(self):
         query_text = self.ai_query_input.text().strip()
@@ -2548,9 +2852,7 @@ class DungeonMasterAssistant(QMainWindow):
             QMessageBox.warning(self, "Input Error", "Please enter a query for the AI.")
             return
 
-        full_prompt = (f"Act as a helpful assistant for a Dungeon Master. Respond to the following request:\n\n"
-                       f"---\n\n{query_text}")
-        self.run_gemini_with_full_prompt(full_prompt)
+        self.run_gemini_with_full_prompt(self.AI_PROMPTS["query"].format(request=query_text))
         self.ai_query_input.clear()
 
     def _on_gen_random_encounter_clicked(self):
@@ -2558,51 +2860,45 @@ class DungeonMasterAssistant(QMainWindow):
                                                  "Describe the environment or context for the encounter (optional):",
                                                  QLineEdit.EchoMode.Normal, "a forest road")
         if ok:
-            full_prompt = (f"Act as a helpful assistant for a Dungeon Master. Generate a random D&D 5e encounter "
-                           f"idea. Include a brief description of the scene, potential creatures, a challenge rating (CR) "
-                           f"suggestion, and a minor plot hook or complication. Context: {prompt_suffix.strip() if prompt_suffix.strip() else 'generic fantasy setting'}")
-            self.run_gemini_with_full_prompt(full_prompt)
+            self.run_gemini_with_full_prompt(
+                self.AI_PROMPTS["encounter"].format(context=prompt_suffix.strip() or "generic fantasy setting"))
 
     def _on_describe_npc_clicked(self):
         prompt_suffix, ok = QInputDialog.getText(self, "Describe an NPC",
                                                  "Provide some keywords or context for the NPC (e.g., 'grumpy dwarf innkeeper', 'mysterious elven ranger'):",
                                                  QLineEdit.EchoMode.Normal, "kind halfling merchant")
         if ok:
-            full_prompt = (
-                f"Act as a helpful assistant for a Dungeon Master. Create a brief description for a D&D NPC. "
-                f"Include their appearance, personality quirk, a secret or goal, and a potential hook for players. "
-                f"Keywords: {prompt_suffix.strip() if prompt_suffix.strip() else 'generic fantasy NPC'}")
-            self.run_gemini_with_full_prompt(full_prompt)
+            self.run_gemini_with_full_prompt(
+                self.AI_PROMPTS["npc"].format(keywords=prompt_suffix.strip() or "generic fantasy NPC"))
 
     def _on_create_plothook_clicked(self):
         prompt_suffix, ok = QInputDialog.getText(self, "Create Plot Hook",
                                                  "Provide a theme or keywords for the plot hook (e.g., 'ancient ruins', 'missing villagers', 'political intrigue'):",
                                                  QLineEdit.EchoMode.Normal, "a strange artifact")
         if ok:
-            full_prompt = (f"Act as a helpful assistant for a Dungeon Master. Generate a D&D plot hook idea. "
-                           f"Describe the initial situation, the inciting incident, and what the players might need to do. "
-                           f"Theme/Keywords: {prompt_suffix.strip() if prompt_suffix.strip() else 'generic fantasy adventure'}")
-            self.run_gemini_with_full_prompt(full_prompt)
+            self.run_gemini_with_full_prompt(
+                self.AI_PROMPTS["plot_hook"].format(keywords=prompt_suffix.strip() or "generic fantasy adventure"))
 
     def _on_gen_dungeon_room_clicked(self):
         prompt_suffix, ok = QInputDialog.getText(self, "Dungeon Room Idea",
                                                  "Describe the type of dungeon or room (e.g., 'goblin cave', 'ancient library', 'magical trap room'):",
                                                  QLineEdit.EchoMode.Normal, "a forgotten crypt")
         if ok:
-            full_prompt = (f"Act as a helpful assistant for a Dungeon Master. Describe a D&D dungeon room. "
-                           f"Include its appearance, notable features, potential traps or puzzles, and any monsters or treasures. "
-                           f"Context: {prompt_suffix.strip() if prompt_suffix.strip() else 'a generic dungeon'}")
-            self.run_gemini_with_full_prompt(full_prompt)
+            self.run_gemini_with_full_prompt(
+                self.AI_PROMPTS["dungeon_room"].format(context=prompt_suffix.strip() or "a generic dungeon"))
 
     def _populate_audio_devices(self):
+        """Enumerates audio devices once; also the Refresh Devices slot that rebuilds the cache."""
+        self.audio_devices = []
+        self.checked_input_devices.clear()
         try:
-            devices = sd.query_devices()
+            devices = self.audio_devices = sd.query_devices()
             self.audio_device_combo.clear()  # Clear existing items
             input_devices = [d for i, d in enumerate(devices) if d['max_input_channels'] > 0]
             if not input_devices:
                 self.audio_device_combo.addItem("No input devices found")
                 self.audio_device_combo.setEnabled(False)
-                self.statusBar().showMessage("No audio input devices detected.")
+                self._show_status("No audio input devices detected.")
                 logging.debug("No input devices found")
                 return
 
@@ -2616,12 +2912,12 @@ class DungeonMasterAssistant(QMainWindow):
                 if self.audio_device_combo.itemData(index) == default_input:
                     self.audio_device_combo.setCurrentIndex(index)
                     break
-            self.statusBar().showMessage(f"Audio input: {self.audio_device_combo.currentText()}")
+            self._show_status(f"Audio input: {self.audio_device_combo.currentText()}")
             logging.debug(f"Populated {self.audio_device_combo.count()} input devices")
         except Exception as e:
             self.audio_device_combo.addItem("Error querying devices")
             self.audio_device_combo.setEnabled(False)
-            self.statusBar().showMessage(f"Error querying audio devices: {e}")
+            self._show_status(f"Error querying audio devices: {e}")
             logging.error(f"Error querying audio devices: {e}")
 
     def _on_audio_device_changed(self, index):
@@ -2629,28 +2925,85 @@ class DungeonMasterAssistant(QMainWindow):
             return
         device_id = self.audio_device_combo.itemData(index)
         if device_id is None:
-            self.statusBar().showMessage("Invalid audio device selected")
+            self._show_status("Invalid audio device selected")
             logging.debug("Invalid audio device selected")
             return
-        try:
-            device_info = sd.query_devices(device_id)
-            if device_info['max_input_channels'] <= 0:
-                raise ValueError("Selected device has no input channels")
-            # Validate sample rate compatibility
-            supported = sd.check_input_settings(device=device_id, samplerate=self.sample_rate, channels=1)
-            self.statusBar().showMessage(f"Selected audio input: {self.audio_device_combo.currentText()}")
-            logging.debug(f"Audio device changed to ID {device_id}: {device_info['name']}")
-        except Exception as e:
-            self.statusBar().showMessage(f"Selected device may be incompatible: {e}")
+        if self.audio_devices[device_id]['max_input_channels'] <= 0:
+            self._on_audio_device_probe_failed(device_id, "Selected device has no input channels")
+            return
+        if device_id in self.checked_input_devices:
+            self._on_audio_device_probed(device_id)
+            return
+        # PortAudio can block for a noticeable time here, so probe on the pool
+        self._show_status(f"Checking audio input: {self.audio_device_combo.currentText()}")
+        runnable = DeviceProbeRunnable(device_id, self.sample_rate)
+        runnable.signals.done.connect(self._on_audio_device_probed)
+        runnable.signals.failed.connect(self._on_audio_device_probe_failed)
+        QThreadPool.globalInstance().start(runnable)
+
+    def _on_audio_device_probed(self, device_id):
+        self.checked_input_devices.add(device_id)
+        if self.audio_device_combo.currentData() == device_id:  # Ignore probes for a superseded choice
+            self._show_status(f"Selected audio input: {self.audio_device_combo.currentText()}")
+            logging.debug(f"Audio device changed to ID {device_id}: {self.audio_devices[device_id]['name']}")
+
+    def _on_audio_device_probe_failed(self, device_id, error_text):
+        logging.warning(f"Invalid device {device_id}: {error_text}")
+        if self.audio_device_combo.currentData() == device_id:
+            self._show_status(f"Selected device may be incompatible: {error_text}")
             self.audio_device_combo.setCurrentIndex(0)  # Revert to first device
-            logging.warning(f"Invalid device {device_id}: {e}")
+
+    def _check_input_device(self, device_id):
+        """Returns the cached info for an input device, validating it at sample_rate once per refresh.
+
+        Raises:
+            ValueError: If the device has no input channels.
+            sd.PortAudioError: If the device does not support the recording settings.
+        """
+        device_info = self.audio_devices[device_id]
+        if device_info['max_input_channels'] <= 0:
+            raise ValueError("Selected device has no input channels")
+        if device_id not in self.checked_input_devices:
+            sd.check_input_settings(device=device_id, samplerate=self.sample_rate, channels=1)
+            self.checked_input_devices.add(device_id)
+        return device_info
 
     def _audio_callback(self, indata, frames, time, status):
         if status:
             print(status, file=sys.stderr)
         if self.recording_state == "recording":
-            self.recorded_frames.append(indata.copy())
-            self.last_peak_level = np.abs(indata).max()
+            # indata is reused by PortAudio after the callback returns; file I/O stays on the writer
+            self.recording_chunks.put(indata.copy())
+            self.recorded_length += frames
+            self.last_peak_level = max(indata.max(), -indata.min())  # |peak| without an abs() temporary
+
+    def _open_recording_writer(self):
+        """Opens a temporary WAV file and starts the thread that writes captured blocks to it."""
+        fd, self.recording_temp_path = tempfile.mkstemp(suffix=".wav", prefix="session_")
+        os.close(fd)
+        self.recording_file = sf.SoundFile(self.recording_temp_path, mode='w', samplerate=self.sample_rate,
+                                           channels=1)
+        self.recording_chunks = queue.SimpleQueue()
+        self.recording_writer = threading.Thread(target=self._write_recording,
+                                                 args=(self.recording_file, self.recording_chunks), daemon=True)
+        self.recording_writer.start()
+
+    @staticmethod
+    def _write_recording(sound_file, chunks):
+        """Writer thread body: drains chunks into sound_file until the None sentinel."""
+        for chunk in iter(chunks.get, None):
+            sound_file.write(chunk)
+
+    def _close_recording_writer(self):
+        """Stops the writer thread once it has drained, closes the file and returns its path."""
+        if self.recording_writer is None:
+            return None
+        self.recording_chunks.put(None)
+        self.recording_writer.join()
+        self.recording_file.close()
+        temp_path = self.recording_temp_path
+        self.recording_chunks = self.recording_writer = self.recording_file = self.recording_temp_path = None
+        return temp_path
 
     def _update_timer_display(self):
         if self.recording_state == "recording":
@@ -2658,25 +3011,24 @@ class DungeonMasterAssistant(QMainWindow):
             minutes, seconds = divmod(self.elapsed_seconds, 60)
             self.timer_label.setText(f"REC: {minutes:02d}:{seconds:02d}")
 
-        if self.playback_stream and self.playback_stream.active and self.loaded_audio_data is not None:
-            # Calculate current time from current_frame
-            current_seconds = self.current_frame // self.sample_rate
-            current_minutes, current_seconds = divmod(current_seconds, 60)
-
-            # Calculate total time from loaded_audio_data
-            total_seconds = len(self.loaded_audio_data) // self.sample_rate
-            total_minutes, total_seconds_rem = divmod(total_seconds, 60)
-
-            self.playback_label.setText(
-                f"PLAY: {current_minutes:02d}:{current_seconds:02d} / {total_minutes:02d}:{total_seconds_rem:02d}"
-            )
-
+    def _update_playback_display(self):
+        if self.playback_stream and self.playback_stream.active and self.playback_file is not None:
+            slider_position = self.current_frame * self.PLAYBACK_SLIDER_STEPS // self.sample_rate
             # Update slider position if not being dragged
-            if not self.playback_slider.isSliderDown():
+            if not self.playback_slider.isSliderDown() and self.playback_slider.value() != slider_position:
                 self.playback_slider.blockSignals(True)  # Prevent recursive signal emission
-                self.playback_slider.setValue(current_seconds)
+                self.playback_slider.setValue(slider_position)
                 self.playback_slider.blockSignals(False)
 
+            position = slider_position // self.PLAYBACK_SLIDER_STEPS
+            if position == self.playback_shown_second:
+                return
+            self.playback_shown_second = position
+            current_minutes, current_seconds = divmod(position, 60)
+            self.playback_label.setText(
+                f"PLAY: {current_minutes:02d}:{current_seconds:02d} / {self.playback_total_text}"
+            )
+
     def _update_mic_level(self):
         level = int(self.last_peak_level * 100)
         self.mic_level_bar.setValue(level)
@@ -2704,19 +3056,19 @@ class DungeonMasterAssistant(QMainWindow):
         self.last_peak_level = 0
         self._update_timer_display()
         self._update_mic_level()
-        self.recorded_frames.clear()
+        self.recorded_length = 0
         selected_device_index = self.audio_device_combo.currentData()
         if selected_device_index is None:
-            QMessageBox.critical(self, "Audio Error", "No valid input device selected or found.")
+            self._show_error("Audio Error", "No valid input device selected or found.")
             logging.error("No valid input device selected")
             return
 
         try:
             # Validate device settings
-            device_info = sd.query_devices(selected_device_index)
-            sd.check_input_settings(device=selected_device_index, samplerate=self.sample_rate, channels=1)
+            device_info = self._check_input_device(selected_device_index)
+            self._open_recording_writer()
             self.recording_state = "recording"
-            self.statusBar().showMessage(f"Recording from: {self.audio_device_combo.currentText()}")
+            self._show_status(f"Recording from: {self.audio_device_combo.currentText()}")
             self.recording_timer.start(1000)
             self.level_check_timer.start(100)
             self.timer_label.setVisible(True)
@@ -2732,15 +3084,16 @@ class DungeonMasterAssistant(QMainWindow):
                 samplerate=self.sample_rate,
                 device=selected_device_index,
                 channels=1,
+                blocksize=self.AUDIO_BLOCK_SIZE,
+                latency='low',
                 callback=self._audio_callback
             )
             self.audio_stream.start()
             logging.debug(f"Started recording with device ID {selected_device_index}: {device_info['name']}")
         except Exception as e:
-            QMessageBox.critical(self, "Recording Error", f"Could not start recording: {e}")
-            self.statusBar().showMessage(f"Recording failed: {e}")
             self.stop_recording()
             logging.error(f"Recording error with device {selected_device_index}: {e}")
+            self._show_error("Recording Error", f"Could not start recording: {e}")
     def stop_recording(self):
         if self.recording_state == "stopped":
             return
@@ -2759,8 +3112,11 @@ class DungeonMasterAssistant(QMainWindow):
         self.pause_button.setEnabled(False)
         self.pause_button.setText("Pause")
         self.load_button.setEnabled(True)
-        if not self.recorded_frames:
-            self.statusBar().showMessage("Recording stopped. No audio data.")
+        temp_path = self._close_recording_writer()
+        if not self.recorded_length:
+            if temp_path:
+                os.remove(temp_path)
+            self._show_status("Recording stopped. No audio data.")
             return
         timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
         default_filename = f"session_{timestamp}"
@@ -2769,20 +3125,20 @@ class DungeonMasterAssistant(QMainWindow):
             wav_path = filePath
             base_path = os.path.splitext(wav_path)[0]
             timestamp_path = f"{base_path}.timestamps.txt"
-            recording = np.concatenate(self.recorded_frames, axis=0)
-            sf.write(wav_path, recording, self.sample_rate)
+            shutil.move(temp_path, wav_path)
             try:
                 with open(timestamp_path, 'w', encoding='utf-8') as f:
                     for seconds, note in self.session_timestamps:
                         f.write(f"{seconds}|{note}\n")
-                self.statusBar().showMessage(f"Session saved to '{os.path.basename(base_path)}'")
+                self._show_status(f"Session saved to '{os.path.basename(base_path)}'")
                 self.current_playback_filepath = wav_path
                 self.transcribe_button.setEnabled(True)
                 self.play_button.setEnabled(True)
             except Exception as e:
                 QMessageBox.warning(self, "Timestamp Save Error", f"Could not save timestamps file: {e}")
         else:
-            self.statusBar().showMessage("Save cancelled.")
+            os.remove(temp_path)
+            self._show_status("Save cancelled.")
 
     def pause_or_resume_recording(self):
         if self.recording_state == "recording":
@@ -2791,34 +3147,51 @@ class DungeonMasterAssistant(QMainWindow):
             self.recording_timer.stop()
             self.mic_level_bar.setValue(0)
             self.pause_button.setText("Resume")
-            self.statusBar().showMessage("Recording paused.")
+            self._show_status("Recording paused.")
         elif self.recording_state == "paused":
             self.recording_state = "recording"
             self.level_check_timer.start(100)
             self.recording_timer.start(1000)
             self.pause_button.setText("Pause")
-            self.statusBar().showMessage("Recording...")
+            self._show_status("Recording...")
 
     def load_session(self):
         self.stop_playback()
         filePath, _ = QFileDialog.getOpenFileName(self, "Load Session Audio", "", "WAV Files (*.wav)")
         if not filePath:
             return
+        # Decoding a long session takes seconds, so read the file on the pool
+        self.pending_audio_path = filePath
+        self._show_status(f"Loading session audio: {os.path.basename(filePath)}")
+        runnable = AudioLoadRunnable(filePath)
+        runnable.signals.loaded.connect(self._on_session_audio_loaded)
+        runnable.signals.failed.connect(self._on_session_audio_load_failed)
+        QThreadPool.globalInstance().start(runnable)
+
+    def _on_session_audio_loaded(self, filePath, sound_file):
+        if filePath != self.pending_audio_path:  # Ignore loads for a superseded choice
+            sound_file.close()
+            return
+        self.pending_audio_path = None
+        self._show_status("")
+        self.stop_playback()
+        if self.playback_file is not None:
+            self.playback_file.close()
+        self.playback_file = sound_file
         try:
-            self.loaded_audio_data, file_samplerate = sf.read(filePath, dtype='float32')
-            if file_samplerate != self.sample_rate:
+            if sound_file.samplerate != self.sample_rate:
                 QMessageBox.warning(self, "Sample Rate Mismatch",
-                                    f"Audio file has a different sample rate ({file_samplerate}) than project ({self.sample_rate}). Playback quality may be affected.")
-            if self.loaded_audio_data.ndim == 1:
-                self.loaded_audio_data = self.loaded_audio_data.reshape(-1, 1)
+                                    f"Audio file has a different sample rate ({sound_file.samplerate}) than project ({self.sample_rate}). Playback quality may be affected.")
+            self.playback_frames, self.playback_channels = sound_file.frames, sound_file.channels
             self.current_playback_filepath = filePath
             self.play_button.setEnabled(True)
             self.transcribe_button.setEnabled(True)
             self.playback_label.setVisible(True)
-            total_seconds = len(self.loaded_audio_data) // self.sample_rate
-            self.playback_slider.setRange(0, total_seconds)
+            total_seconds = self.playback_frames // self.sample_rate
+            total_minutes, total_seconds_rem = divmod(total_seconds, 60)
+            self.playback_total_text = f"{total_minutes:02d}:{total_seconds_rem:02d}"
+            self.playback_slider.setRange(0, self.playback_frames * self.PLAYBACK_SLIDER_STEPS // self.sample_rate)
             self.playback_slider.setEnabled(True)
-            self._update_timer_display()  # Update UI immediately
             # Load timestamps
             self.timestamp_list.clear()
             base_path = os.path.splitext(filePath)[0]
@@ -2826,21 +3199,33 @@ class DungeonMasterAssistant(QMainWindow):
             if os.path.exists(timestamp_path):
                 try:
                     with open(timestamp_path, 'r', encoding='utf-8') as f:
-                        for line in f:
-                            parts = line.strip().split('|', 1)
-                            if len(parts) == 2:
-                                seconds, note = int(parts[0]), parts[1]
-                                minutes, sec = divmod(seconds, 60)
-                                display_text = f"[{minutes:02d}:{sec:02d}] {note}"
-                                list_item = QListWidgetItem(display_text)
-                                list_item.setData(Qt.ItemDataRole.UserRole, seconds)
-                                self.timestamp_list.addItem(list_item)
+                        marks = [line.strip().split('|', 1) for line in f.read().splitlines() if '|' in line]
+                    # Build every item first, then add them with repaints held off
+                    items = []
+                    for seconds, note in ((int(parts[0]), parts[1]) for parts in marks):
+                        minutes, sec = divmod(seconds, 60)
+                        list_item = QListWidgetItem(f"[{minutes:02d}:{sec:02d}] {note}")
+                        list_item.setData(Qt.ItemDataRole.UserRole, seconds)
+                        items.append(list_item)
+                    self.timestamp_list.setUpdatesEnabled(False)
+                    try:
+                        for list_item in items:
+                            self.timestamp_list.addItem(list_item)
+                    finally:
+                        self.timestamp_list.setUpdatesEnabled(True)
                 except Exception as e:
                     QMessageBox.warning(self, "Timestamp Load Error", f"Could not load timestamps file: {e}")
             self.play_recording()  # Start playback immediately after loading
         except Exception as e:
             QMessageBox.critical(self, "File Error", f"Could not load audio file: {e}")
 
+    def _on_session_audio_load_failed(self, filePath, error_text):
+        if filePath != self.pending_audio_path:
+            return
+        self.pending_audio_path = None
+        self._show_status("")
+        QMessageBox.critical(self, "File Error", f"Could not load audio file: {error_text}")
+
     def on_timestamp_item_clicked(self, item):
         start_time = item.data(Qt.ItemDataRole.UserRole)
         if isinstance(start_time, int):
@@ -2849,18 +3234,17 @@ class DungeonMasterAssistant(QMainWindow):
     def _playback_callback(self, outdata, frames, time, status):
         if status:
             print(status, file=sys.stderr)
-        chunk_end = self.current_frame + frames
-        remaining_frames = len(self.loaded_audio_data) - self.current_frame
-        if remaining_frames >= frames:
-            outdata[:] = self.loaded_audio_data[self.current_frame:chunk_end]
-            self.current_frame += frames
-        else:
-            outdata[:remaining_frames] = self.loaded_audio_data[self.current_frame:]
-            outdata[remaining_frames:] = 0
+        start = self.current_frame
+        if self.playback_file.tell() != start:  # seek_audio moved the position
+            self.playback_file.seek(start)
+        read_frames = len(self.playback_file.read(frames, dtype='float32', always_2d=True, out=outdata))
+        if read_frames < frames:
+            outdata[read_frames:] = 0
             raise sd.CallbackStop
+        self.current_frame = start + frames
 
     def play_recording(self, start_time=0):
-        if self.loaded_audio_data is None:
+        if self.playback_file is None:
             QMessageBox.warning(self, "Playback Error", "No audio session loaded. Please use 'Load Session'.")
             logging.debug("Playback attempted with no loaded audio data")
             return
@@ -2870,27 +3254,28 @@ class DungeonMasterAssistant(QMainWindow):
 
         # Set the starting frame based on start_time
         self.current_frame = int(start_time * self.sample_rate)
-        self.playback_slider.setValue(start_time)
+        self.playback_slider.setValue(int(start_time * self.PLAYBACK_SLIDER_STEPS))
 
         try:
             self.playback_stream = sd.OutputStream(
                 samplerate=self.sample_rate,
-                channels=self.loaded_audio_data.shape[1],
+                channels=self.playback_channels,
+                blocksize=self.AUDIO_BLOCK_SIZE,
+                latency='low',
                 callback=self._playback_callback,
                 finished_callback=self.stop_playback
             )
             self.playback_stream.start()
-            self.recording_timer.start(1000)  # Update every second
+            self.playback_shown_second = None
+            self.playback_timer.start()
             self.play_button.setText("Stop Playback")
-            self.play_button.clicked.disconnect()
-            self.play_button.clicked.connect(self.stop_playback)
             self.playback_label.setVisible(True)
             self.playback_slider.setEnabled(True)
             logging.debug(f"Started playback from {start_time} seconds")
         except Exception as e:
-            QMessageBox.critical(self, "Playback Error", f"Could not start playback stream: {e}")
             self.stop_playback()
             logging.error(f"Playback error: {e}")
+            self._show_error("Playback Error", f"Could not start playback stream: {e}")
 
     def stop_playback(self):
         stream = self.playback_stream
@@ -2898,27 +3283,29 @@ class DungeonMasterAssistant(QMainWindow):
             self.playback_stream = None
             stream.stop()
             stream.close()
-        self.recording_timer.stop()
+        self.playback_timer.stop()
         self.playback_label.setVisible(False)
         self.playback_slider.setValue(0)
         self.playback_slider.setEnabled(False)
         self.play_button.setText("Play")
-        try:
-            self.play_button.clicked.disconnect()
-        except TypeError:
-            pass
-        self.play_button.clicked.connect(self.play_recording)
+
+    def _on_play_clicked(self):
+        # One connection for both button roles; the open stream says which one is showing
+        if self.playback_stream:
+            self.stop_playback()
+        else:
+            self.play_recording()
 
     def seek_audio(self):
-        if self.loaded_audio_data is None:
+        if self.playback_file is None:
             logging.debug("Seek attempted with no loaded audio data")
             return
-        seek_time = self.playback_slider.value()
-        logging.debug(f"Seeking to {seek_time} seconds")
+        seek_time = self.playback_slider.value() / self.PLAYBACK_SLIDER_STEPS
+        logging.debug(f"Seeking to {seek_time:.2f} seconds")
         if self.playback_stream and self.playback_stream.active:
             # Update current_frame directly instead of restarting stream
             self.current_frame = int(seek_time * self.sample_rate)
-            self._update_timer_display()
+            self._update_playback_display()
         else:
             # If no stream is active, start playback from seek_time
             self.play_recording(start_time=seek_time)
@@ -2932,7 +3319,7 @@ class DungeonMasterAssistant(QMainWindow):
             return
         self.set_ai_buttons_enabled(False)
         self.transcribe_button.setEnabled(False)
-        self.transcriber_worker = AudioTranscriberWorker(model=self.gemini_model,
+        self.transcriber_worker = AudioTranscriberWorker(model=self.transcription_model,
                                                          file_path=self.current_playback_filepath)
         self.transcriber_worker.transcription_finished.connect(self.on_transcription_finished)
         self.transcriber_worker.finished.connect(self.transcriber_worker.deleteLater)
@@ -2943,6 +3330,7 @@ class DungeonMasterAssistant(QMainWindow):
             dialog = ResponseDialog(transcript, self)
             dialog.timestamp_clicked.connect(self.play_recording)
             dialog.exec()
+            self._ensure_main_tab("AI Assistant")
             self.analysis_text_box.setPlainText(transcript)
         else:
             QMessageBox.warning(self, "Transcription Status", status_or_error)
@@ -2954,33 +3342,49 @@ class DungeonMasterAssistant(QMainWindow):
         if not source_text:
             QMessageBox.warning(self, "Input Error", "Please paste a transcript or notes to summarize.")
             return
-        prompt = (f"Act as a helpful assistant for a Dungeon Master. Read the following D&D session notes/transcript "
-                  f"and provide a concise summary of the key events, important player decisions, and major outcomes."
-                  f"\n\n---\n\n{source_text}")
-        self.run_gemini_with_full_prompt(prompt)
+        self.run_gemini_with_full_prompt(self.AI_PROMPTS["summary"].format(source=source_text))
 
     def run_information_extraction(self):
         source_text = self.analysis_text_box.toPlainText()
         if not source_text:
             QMessageBox.warning(self, "Input Error", "Please paste a transcript or notes to extract information from.")
             return
-        prompt = (f"Act as a helpful assistant for a Dungeon Master. Read the following D&D session notes/transcript "
-                  f"and extract the following information. If a category has no information, write 'None'.\n\n"
-                  f"- **Key NPCs Mentioned:**\n"
-                  f"- **Locations Visited or Described:**\n"
-                  f"- **Quests Started or Advanced:**\n"
-                  f"- **Unique Items or Loot Found:**\n\n"
-                  f"---\n\n{source_text}")
-        self.run_gemini_with_full_prompt(prompt)
+        self.run_gemini_with_full_prompt(self.AI_PROMPTS["extraction"].format(source=source_text))
 
     def _refresh_npc_tab(self):
-        """Rebuilds and populates the entire NPC tab."""
-        # Define the headers for the table summary
-        headers = ["Name", "Type", "Location", "Status", "Race", "Class"]
+        """Builds the NPC tab on first use, then reloads every row from the database."""
+        if self.npc_table is None:
+            self._build_npc_tab()
+
+        query = self._list_query(self._read_session(), NPC)
+        if self.pending_npc_deletes:
+            query = query.filter(NPC.id.not_in([npc.id for npc in self.pending_npc_deletes]))
+        self.npc_model.set_rows(query.order_by(NPC.name).all())
+        self._resort_npc_table()
+
+    def _update_npc_row(self, row, npc_id):
+        """Appends (row=None) or replaces a single NPC row, leaving the rest of the table alone."""
+        # The writing session is closed by now; reload the summary columns through the read session
+        npc = self._list_query(self._read_session(), NPC).filter(NPC.id == npc_id).one()
+        if row is None:
+            self.npc_model.append_row(npc)
+        else:
+            self.npc_model.replace_row(row, npc)
+        self._resort_npc_table()
 
-        # Main widget and layout
-        widget = QWidget()
-        layout = QVBoxLayout(widget)
+    def _resort_npc_table(self):
+        """Re-applies the header's sort order, which the model does not keep up by itself."""
+        header = self.npc_table.horizontalHeader()
+        self.npc_model.sort(header.sortIndicatorSection(), header.sortIndicatorOrder())
+
+    def _selected_npc_row(self):
+        """Returns the model row of the selected NPC, or None when nothing is selected."""
+        selected = self.npc_table.selectionModel().selectedRows()
+        return selected[0].row() if selected else None
+
+    def _build_npc_tab(self):
+        """Creates the NPC tab's controls and table inside its placeholder widget."""
+        layout = QVBoxLayout(self.npc_tab_content)
 
         # Control buttons
         controls_group = QGroupBox("NPC Management")
@@ -2999,37 +3403,16 @@ class DungeonMasterAssistant(QMainWindow):
         layout.addWidget(controls_group)
 
         # Create and configure the table
-        self.npc_table = QTableWidget(0, len(headers))
-        self.npc_table.setHorizontalHeaderLabels(headers)
-        self.npc_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        self.npc_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.npc_model = EntityTableModel(self.NPC_COLUMNS, parent=self.npc_tab_content)
+        self.npc_table = QTableView()
+        self.npc_table.setModel(self.npc_model)
+        self.npc_table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
+        self.npc_table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.npc_table.horizontalHeader().setSortIndicator(0, Qt.SortOrder.AscendingOrder)  # The query's order
         self.npc_table.setSortingEnabled(True)
-        self.npc_table.itemDoubleClicked.connect(self._on_edit_npc_clicked)
+        self.npc_table.doubleClicked.connect(self._on_edit_npc_clicked)
         layout.addWidget(self.npc_table)
 
-        # Fetch data from DB and populate table
-        db_session = SessionLocal()
-        try:
-            npcs = db_session.query(NPC).order_by(NPC.name).all()
-            self.npc_table.setRowCount(len(npcs))
-            for row_num, npc in enumerate(npcs):
-                # Store the npc id in the first item for easy retrieval
-                name_item = QTableWidgetItem(npc.name)
-                name_item.setData(Qt.ItemDataRole.UserRole, npc.id)
-
-                self.npc_table.setItem(row_num, 0, name_item)
-                self.npc_table.setItem(row_num, 1, QTableWidgetItem(npc.npc_type))
-                self.npc_table.setItem(row_num, 2, QTableWidgetItem(npc.location))
-                self.npc_table.setItem(row_num, 3, QTableWidgetItem(npc.status))
-                self.npc_table.setItem(row_num, 4, QTableWidgetItem(npc.race))
-                self.npc_table.setItem(row_num, 5, QTableWidgetItem(npc.npc_class))
-        finally:
-            db_session.close()
-
-        # Replace the old tab content with the new, fully-featured widget
-        self.npc_tab_content = widget
-        self._replace_entity_tab("NPCs", self.npc_tab_content, 5)  # Assuming NPC is the 6th tab (index 5)
-
     def _on_add_npc_clicked(self):
         """Handles the 'Add New NPC' button click."""
         dialog = AddEditNPCDialog(parent=self)
@@ -3044,8 +3427,8 @@ class DungeonMasterAssistant(QMainWindow):
             try:
                 db_session.add(new_npc)
                 db_session.commit()
-                self.statusBar().showMessage(f"NPC '{data['name']}' saved successfully.")
-                self._refresh_npc_tab()
+                self._show_status(f"NPC '{data['name']}' saved successfully.")
+                self._update_npc_row(None, new_npc.id)
             except Exception as e:
                 db_session.rollback()
                 QMessageBox.critical(self, "Database Error",
@@ -3055,21 +3438,20 @@ class DungeonMasterAssistant(QMainWindow):
 
     def _on_edit_npc_clicked(self):
         """Handles editing the selected NPC."""
-        selected_items = self.npc_table.selectedItems()
-        if not selected_items:
-            QMessageBox.warning(self, "Selection Error", "Please select an NPC to view or edit.")
+        npc_row = self._selected_npc_row()
+        if npc_row is None:
+            self._warn_selection("Please select an NPC to view or edit.")
             return
 
-        # Get the ID we stored in the name item's UserRole
-        npc_id = selected_items[0].data(Qt.ItemDataRole.UserRole)
+        npc_id = self.npc_model.row_at(npc_row).id
 
         db_session = SessionLocal()
         try:
-            npc_to_edit = db_session.query(NPC).filter(NPC.id == npc_id).first()
+            npc_to_edit = db_session.get(NPC, npc_id)
             if not npc_to_edit:
                 QMessageBox.critical(self, "Error",
                                      "Could not find the selected NPC in the database. It may have been deleted.")
-                self._refresh_npc_tab()
+                QTimer.singleShot(0, self._refresh_npc_tab)  # After this session closes and the box's repaint
                 return
 
             dialog = AddEditNPCDialog(npc=npc_to_edit, parent=self)
@@ -3084,8 +3466,8 @@ class DungeonMasterAssistant(QMainWindow):
                     setattr(npc_to_edit, key, value)
 
                 db_session.commit()
-                self.statusBar().showMessage(f"NPC '{data['name']}' updated successfully.")
-                self._refresh_npc_tab()
+                self._show_status(f"NPC '{data['name']}' updated successfully.")
+                self._update_npc_row(npc_row, npc_id)
         except Exception as e:
             db_session.rollback()
             QMessageBox.critical(self, "Database Error", f"Could not update NPC.\n\nDetails: {e}")
@@ -3094,34 +3476,52 @@ class DungeonMasterAssistant(QMainWindow):
 
     def _on_remove_npc_clicked(self):
         """Handles removing the selected NPC."""
-        selected_items = self.npc_table.selectedItems()
-        if not selected_items:
-            QMessageBox.warning(self, "Selection Error", "Please select an NPC to remove.")
+        npc_row = self._selected_npc_row()
+        if npc_row is None:
+            self._warn_selection("Please select an NPC to remove.")
             return
 
-        npc_id = selected_items[0].data(Qt.ItemDataRole.UserRole)
-        npc_name = selected_items[0].text()
-
-        reply = QMessageBox.question(self, "Confirm Deletion",
-                                     f"Are you sure you want to permanently delete '{npc_name}'?",
-                                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
-                                     QMessageBox.StandardButton.No)
-        if reply == QMessageBox.StandardButton.No:
+        # Hide the row now and offer an undo instead of asking for confirmation first
+        npc = self.npc_model.row_at(npc_row)
+        self.npc_model.remove_row(npc_row)
+        self.pending_npc_deletes.append(npc)
+        self.npc_delete_timer.start()
+        self._show_status(f"NPC '{npc.name}' has been deleted.", self.NPC_DELETE_UNDO_MS)
+        self.undo_delete_button.show()
+
+    def _undo_npc_delete(self):
+        """Puts back the most recently removed NPC whose delete has not been committed yet."""
+        if not self.pending_npc_deletes:
             return
-
-        db_session = SessionLocal()
-        try:
-            npc_to_delete = db_session.query(NPC).filter(NPC.id == npc_id).first()
-            if npc_to_delete:
-                db_session.delete(npc_to_delete)
-                db_session.commit()
-                self.statusBar().showMessage(f"NPC '{npc_name}' has been deleted.")
-                self._refresh_npc_tab()
-        except Exception as e:
-            db_session.rollback()
-            QMessageBox.critical(self, "Database Error", f"Could not delete NPC.\n\nDetails: {e}")
-        finally:
-            db_session.close()
+        npc = self.pending_npc_deletes.pop()
+        self.npc_model.append_row(npc)
+        self._resort_npc_table()
+        self._show_status(f"NPC '{npc.name}' has been restored.")
+        if not self.pending_npc_deletes:
+            self.npc_delete_timer.stop()
+            self.undo_delete_button.hide()
+
+    def _flush_npc_deletes(self):
+        """Commits every pending NPC delete in one statement on the pool."""
+        self.npc_delete_timer.stop()
+        self.undo_delete_button.hide()
+        if not self.pending_npc_deletes:
+            return
+        npc_ids = [npc.id for npc in self.pending_npc_deletes]
+        self.pending_npc_deletes = []
+        # The commit waits on a disk sync, so run it on the pool
+        runnable = NPCDeleteRunnable(npc_ids)
+        runnable.signals.done.connect(self._on_npcs_deleted)
+        runnable.signals.failed.connect(self._on_npc_delete_failed)
+        QThreadPool.globalInstance().start(runnable)
+
+    def _on_npcs_deleted(self, npc_ids, deleted_count):
+        logging.debug(f"Deleted {deleted_count} of {len(npc_ids)} NPCs")
+
+    def _on_npc_delete_failed(self, npc_ids, error_text):
+        logging.error(f"Could not delete NPCs {npc_ids}: {error_text}")
+        self._show_error("Database Error", f"Could not delete NPC: {error_text}")
+        QTimer.singleShot(0, self._refresh_npc_tab)  # Bring back the rows that were not deleted
 
 
 if __name__ == '__main__':